@@ -1,30 +1,231 @@
+import time
+_START_TIME = time.perf_counter()
+
+import csv
+import os
 import sys
-import pickle
-import nltk
-import string
-from nltk.corpus import stopwords
-from nltk.stem.porter import PorterStemmer
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
-from PyQt5.QtCore import Qt, QTimer, QRect, QPropertyAnimation, QEasingCurve
+from collections import deque
+import metrics
+from inference import MODEL_NAMES, VECTORIZER_KEY, has_model
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, classify_cached
+from PyQt5.QtWidgets import (QApplication, QWidget, QFrame, QLabel, QComboBox, QTextEdit, QPushButton,
+                             QVBoxLayout, QHBoxLayout, QFileDialog, QProgressBar, QTableView, QHeaderView)
+from PyQt5.QtGui import QPainter, QConicalGradient, QColor, QBrush, QFont
+from PyQt5.QtCore import (Qt, QTimer, QRect, QPropertyAnimation, QEasingCurve, QObject, QRunnable, QThreadPool,
+                          pyqtSignal, QAbstractTableModel, QModelIndex)
+
+# -----------------------------
+# Models (loaded on first use)
+# -----------------------------
+MODEL_KEYS = {"SVC": "svc", "Naive Bayes": "nb", "Linear SVM": "linear", "Ensemble": "ensemble"}
+
+# Watches best_models/ and swaps retrained artifacts in without a restart
+models = ModelRegistry()
+prediction_cache = PredictionCache()
+models.on_swap(lambda version: prediction_cache.clear())
+pipeline_metrics = metrics.enable()
+
+STAGE_LABELS = [("tokenize", "tokenize"), ("stopwords", "filter"), ("stem", "stem"),
+                ("vectorize", "vectorize"), ("predict", "model")]
+
+def default_model():
+    # First entry of the model menu whose artifacts actually ship
+    for name, key in MODEL_KEYS.items():
+        if has_model(key):
+            return name
+    return next(iter(MODEL_KEYS))
+
+
+BULK_CHUNK_SIZE = 500
+PREVIEW_CHARS = 200
+BULK_FILE_FILTER = "Messages (*.csv *.jsonl *.json *.mbox);;All files (*)"
 
 # -----------------------------
-# Load Models
+# Background Classification Worker
 # -----------------------------
-tfid = pickle.load(open("best_models/tfidf.pkl", "rb"))
-svc  = pickle.load(open("best_models/svc_best.pkl", "rb"))
-nb   = pickle.load(open("best_models/nb_model.pkl", "rb"))
+class ClassificationSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class ClassificationWorker(QRunnable):
+    def __init__(self, request_id, message, model_key, model_name):
+        super().__init__()
+        self.request_id = request_id
+        self.message = message
+        self.model_key = model_key
+        self.model_name = model_name
+        self.cancelled = False
+        self.signals = ClassificationSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _emit(self, signal, *args):
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            # The window was closed while this worker was still running
+            pass
+
+    def run(self):
+        # Deferred so NLTK is not imported before the window appears
+        from preprocessing import transform_text
+
+        pipeline_metrics.reset_last()
+        try:
+            version, vectorizer, model = models.snapshot(self.model_key)
+            transformed = transform_text(self.message)
+            if self.cancelled:
+                return
+            hits = prediction_cache.hits
+            predictions, probabilities = classify_cached(prediction_cache, vectorizer, model,
+                                                         self.model_key, [transformed], version)
+            if self.cancelled:
+                return
+            self._emit(self.signals.finished, self.request_id, {
+                "prediction": predictions[0],
+                "probabilities": probabilities[0],
+                "model_name": self.model_name,
+                "words": len(transformed.split()),
+                "cached": prediction_cache.hits > hits,
+                "timings": pipeline_metrics.last_timings(),
+            })
+        except Exception as e:
+            pipeline_metrics.record_error(self.model_key)
+            if not self.cancelled:
+                self._emit(self.signals.failed, self.request_id, str(e))
+
+# -----------------------------
+# Bulk File Classification
+# -----------------------------
+class BulkSignals(QObject):
+    started = pyqtSignal(int, int)
+    rows = pyqtSignal(int, object)
+    finished = pyqtSignal(int, bool)
+    failed = pyqtSignal(int, str)
+
+
+class BulkClassificationWorker(QRunnable):
+    def __init__(self, job_id, path, model_key):
+        super().__init__()
+        self.job_id = job_id
+        self.path = path
+        self.model_key = model_key
+        self.cancelled = False
+        self.signals = BulkSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _emit(self, signal, *args):
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            pass
+
+    def run(self):
+        from batch_classify import classify_stream, count_records, open_reader
+
+        try:
+            # Counting raw records (no MIME or message decoding) gives the progress bar its range
+            total = count_records(self.path)
+            if self.cancelled:
+                self._emit(self.signals.finished, self.job_id, True)
+                return
+            self._emit(self.signals.started, self.job_id, total)
+
+            previews = deque()
+
+            def remember(messages):
+                for text, label in messages:
+                    previews.append(" ".join(text[:PREVIEW_CHARS].split()))
+                    yield text, label
+
+            # One pair for the whole file, so a hot swap mid-run cannot mix model versions
+            vectorizer, model = models.pair(self.model_key)
+            rows = classify_stream(remember(open_reader(self.path)), vectorizer, model,
+                                   BULK_CHUNK_SIZE, model_key=self.model_key)
+            batch = []
+            for row in rows:
+                if self.cancelled:
+                    break
+                row["message"] = previews.popleft()
+                batch.append(row)
+                if len(batch) == BULK_CHUNK_SIZE:
+                    self._emit(self.signals.rows, self.job_id, batch)
+                    batch = []
+            if batch:
+                self._emit(self.signals.rows, self.job_id, batch)
+            self._emit(self.signals.finished, self.job_id, self.cancelled)
+        except Exception as e:
+            pipeline_metrics.record_error(self.model_key)
+            self._emit(self.signals.failed, self.job_id, str(e))
+
+
+class ResultsTableModel(QAbstractTableModel):
+    # Only the rows in view are ever painted, so 100k results are just 100k tuples.
+    # The message column holds a short preview; export reads the full text back from the input file.
+    COLUMNS = [("index", "#"), ("prediction", "Prediction"), ("confidence", "Confidence"),
+               ("spam_probability", "Spam probability"), ("label", "Label"), ("message", "Message")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.results = []
+        self.spam = 0
+        self.source = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.results)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.results[index.row()][index.column()]
+        field = self.COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            if field in ("confidence", "spam_probability"):
+                return f"{value * 100:.1f}%"
+            return str(value)
+        if role == Qt.ForegroundRole and field == "prediction":
+            return QColor("#ef4444") if value == "spam" else QColor("#10b981")
+        if role == Qt.ToolTipRole and field == "message":
+            return value
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return None
 
+    def append_rows(self, rows):
+        first = len(self.results)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.results.extend(tuple(row[field] for field, _ in self.COLUMNS) for row in rows)
+        self.endInsertRows()
+        self.spam += sum(row["prediction"] == "spam" for row in rows)
 
-ps = PorterStemmer()
+    def clear(self, source=None):
+        self.beginResetModel()
+        self.results = []
+        self.spam = 0
+        self.source = source
+        self.endResetModel()
 
-def transform_text(text):
-    text = text.lower()
-    tokens = nltk.word_tokenize(text)
-    tokens = [t for t in tokens if t.isalnum()]
-    tokens = [t for t in tokens if t not in stopwords.words('english') and t not in string.punctuation]
-    tokens = [ps.stem(t) for t in tokens]
-    return " ".join(tokens)
+    def export_csv(self, path):
+        from batch_classify import open_reader
+
+        # Results are in input order, so the i-th message read back belongs to row i
+        messages = open_reader(self.source) if self.source else iter(())
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([field for field, _ in self.COLUMNS])
+            for row, (text, _) in zip(self.results, messages):
+                writer.writerow(row[:-1] + (text,))
 
 # -----------------------------
 # Loading Spinner Widget
@@ -61,7 +262,14 @@ class LoadingSpinner(QWidget):
 class SpamClassifierApp(QWidget):
     def __init__(self):
         super().__init__()
-        self.current_model = "SVC"
+        self.current_model = default_model()
+        self.thread_pool = QThreadPool.globalInstance()
+        self.active_worker = None
+        self.request_id = 0
+        self.bulk_worker = None
+        self.bulk_job_id = 0
+        self.bulk_total = 0
+        self.bulk_started_at = 0.0
         self.initUI()
         
     def initUI(self):
@@ -126,6 +334,10 @@ class SpamClassifierApp(QWidget):
         self.model_combo = QComboBox()
         self.model_combo.addItem("SVC Classifier")
         self.model_combo.addItem("Naive Bayes")
+        self.model_combo.addItem("Linear SVM")
+        self.model_combo.addItem("Ensemble")
+        # Menu entries are in MODEL_KEYS order
+        self.model_combo.setCurrentIndex(list(MODEL_KEYS).index(self.current_model))
         self.model_combo.setFixedHeight(40)
         self.model_combo.setStyleSheet("""
             QComboBox {
@@ -241,6 +453,27 @@ class SpamClassifierApp(QWidget):
         sample_btn.clicked.connect(self.load_example_message)
         button_layout.addWidget(sample_btn)
         
+        # Open file button
+        self.open_file_btn = QPushButton("Open File...")
+        self.open_file_btn.setFixedHeight(40)
+        self.open_file_btn.setFixedWidth(120)
+        self.open_file_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #f1f5f9;
+                color: #6366f1;
+                font-size: 14px;
+                font-weight: 500;
+                border-radius: 8px;
+                border: 2px solid #e2e8f0;
+            }
+            QPushButton:hover {
+                background-color: #e0e7ff;
+                color: #4f46e5;
+            }
+        """)
+        self.open_file_btn.clicked.connect(self.open_bulk_file)
+        button_layout.addWidget(self.open_file_btn)
+        
         # Classify button
         self.classify_btn = QPushButton("Classify Message")
         self.classify_btn.setFixedHeight(40)
@@ -336,11 +569,111 @@ class SpamClassifierApp(QWidget):
         self.model_info_label.setStyleSheet("font-size: 12px; color: #94a3b8;")
         info_layout.addWidget(self.model_info_label)
         
+        self.stage_timing_label = QLabel("")
+        self.stage_timing_label.setStyleSheet("font-size: 11px; color: #94a3b8;")
+        info_layout.addWidget(self.stage_timing_label)
+        
         content_layout.addLayout(info_layout)
         results_layout.addLayout(content_layout)
         
         main_layout.addWidget(results_frame)
         
+        # Bulk results section (shown once a file is opened)
+        self.bulk_frame = QFrame()
+        self.bulk_frame.setStyleSheet("""
+            QFrame {
+                background-color: white;
+                border-radius: 12px;
+                border: 1px solid #e2e8f0;
+            }
+        """)
+        bulk_layout = QVBoxLayout(self.bulk_frame)
+        bulk_layout.setContentsMargins(20, 15, 20, 15)
+        bulk_layout.setSpacing(10)
+        
+        bulk_header = QHBoxLayout()
+        self.bulk_title = QLabel("File Results")
+        self.bulk_title.setStyleSheet("font-size: 16px; font-weight: bold; color: #334155; border: none;")
+        bulk_header.addWidget(self.bulk_title)
+        bulk_header.addStretch()
+        
+        self.throughput_label = QLabel("")
+        self.throughput_label.setStyleSheet("font-size: 12px; color: #64748b; border: none;")
+        bulk_header.addWidget(self.throughput_label)
+        
+        self.cancel_bulk_btn = QPushButton("Cancel")
+        self.cancel_bulk_btn.setFixedHeight(32)
+        self.cancel_bulk_btn.setFixedWidth(90)
+        self.cancel_bulk_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #fef2f2;
+                color: #ef4444;
+                font-size: 13px;
+                border-radius: 8px;
+                border: 2px solid #fecaca;
+            }
+            QPushButton:disabled {
+                background-color: #f1f5f9;
+                color: #94a3b8;
+                border-color: #e2e8f0;
+            }
+        """)
+        self.cancel_bulk_btn.clicked.connect(self.cancel_bulk)
+        bulk_header.addWidget(self.cancel_bulk_btn)
+        
+        self.export_btn = QPushButton("Export CSV")
+        self.export_btn.setFixedHeight(32)
+        self.export_btn.setFixedWidth(110)
+        self.export_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #f1f5f9;
+                color: #6366f1;
+                font-size: 13px;
+                border-radius: 8px;
+                border: 2px solid #e2e8f0;
+            }
+            QPushButton:disabled {
+                color: #94a3b8;
+            }
+        """)
+        self.export_btn.clicked.connect(self.export_results)
+        bulk_header.addWidget(self.export_btn)
+        bulk_layout.addLayout(bulk_header)
+        
+        self.bulk_progress = QProgressBar()
+        self.bulk_progress.setFixedHeight(14)
+        self.bulk_progress.setTextVisible(False)
+        self.bulk_progress.setStyleSheet("""
+            QProgressBar {
+                background-color: #f1f5f9;
+                border: none;
+                border-radius: 7px;
+            }
+            QProgressBar::chunk {
+                background-color: #6366f1;
+                border-radius: 7px;
+            }
+        """)
+        bulk_layout.addWidget(self.bulk_progress)
+        
+        self.results_model = ResultsTableModel(self)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
+        self.results_table.setMinimumHeight(220)
+        self.results_table.setAlternatingRowColors(True)
+        self.results_table.setSelectionBehavior(QTableView.SelectRows)
+        self.results_table.setWordWrap(False)
+        self.results_table.verticalHeader().hide()
+        # Fixed row heights keep the view from measuring every row
+        self.results_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.results_table.verticalHeader().setDefaultSectionSize(24)
+        self.results_table.horizontalHeader().setStretchLastSection(True)
+        self.results_table.setStyleSheet("font-size: 12px; color: #334155; border: 1px solid #e2e8f0;")
+        bulk_layout.addWidget(self.results_table)
+        
+        self.bulk_frame.setVisible(False)
+        main_layout.addWidget(self.bulk_frame)
+        
         # Status bar
         self.status_label = QLabel("Ready to classify messages")
         self.status_label.setFixedHeight(30)
@@ -398,9 +731,18 @@ class SpamClassifierApp(QWidget):
         if "Naive Bayes" in text:
             self.current_model = "Naive Bayes"
             self.status_label.setText("Using Naive Bayes model")
+        elif "Linear SVM" in text:
+            self.current_model = "Linear SVM"
+            self.status_label.setText("Using Linear SVM model")
+        elif "Ensemble" in text:
+            self.current_model = "Ensemble"
+            self.status_label.setText("Using ensemble of all available models")
         else:
             self.current_model = "SVC"
             self.status_label.setText("Using SVC model")
+        
+        # Start loading the newly selected model before the first classification
+        models.prefetch(VECTORIZER_KEY, MODEL_KEYS[self.current_model])
             
         self.status_label.setStyleSheet("""
             QLabel {
@@ -447,8 +789,18 @@ class SpamClassifierApp(QWidget):
             """)
             return
             
+        # Cancel any classification still in flight, its result is stale now
+        self.cancel_active_worker()
+
+        model_key = MODEL_KEYS[self.current_model]
+
+        self.request_id += 1
+        worker = ClassificationWorker(self.request_id, message, model_key, MODEL_NAMES[model_key])
+        worker.signals.finished.connect(self.on_classification_finished)
+        worker.signals.failed.connect(self.on_classification_failed)
+        self.active_worker = worker
+
         # Show loading state
-        self.classify_btn.setEnabled(False)
         self.classify_btn.setText("Processing...")
         self.loading_spinner.show()
         self.loading_spinner._timer.start(50)
@@ -466,23 +818,34 @@ class SpamClassifierApp(QWidget):
             }
         """)
         
-        # Process after short delay
-        QTimer.singleShot(500, lambda: self.process_classification(message))
+        self.thread_pool.start(worker)
         
-    def process_classification(self, message):
-        try:
-            transformed = transform_text(message)
-            vector = tfid.transform([transformed]).toarray()
+    def cancel_active_worker(self):
+        if self.active_worker is not None:
+            self.active_worker.cancel()
+            # Drop it from the queue if it has not started yet
+            try:
+                self.thread_pool.tryTake(self.active_worker)
+            except RuntimeError:
+                # Already finished and deleted by the pool
+                pass
+            self.active_worker = None
             
-            if self.current_model == "SVC":
-                model = svc
-                model_name = "SVC Classifier"
-            else:
-                model = nb
-                model_name = "Naive Bayes"
-                
-            prediction = model.predict(vector)[0]
-            probabilities = model.predict_proba(vector)[0]
+    def on_classification_finished(self, request_id, result):
+        if request_id != self.request_id:
+            return
+        self.process_classification(result)
+        
+    def on_classification_failed(self, request_id, error):
+        if request_id != self.request_id:
+            return
+        self.show_classification_error(error)
+        
+    def process_classification(self, result):
+        try:
+            prediction = result["prediction"]
+            probabilities = result["probabilities"]
+            model_name = result["model_name"]
             
             if prediction == 1:
                 result_text = "SPAM DETECTED"
@@ -498,7 +861,12 @@ class SpamClassifierApp(QWidget):
             self.prediction_label.setText(f"<b>{result_text}</b>")
             self.prediction_label.setStyleSheet(f"font-size: 18px; font-weight: bold; color: {result_color};")
             
-            self.model_info_label.setText(f"{model_name} • {len(transformed.split())} words processed")
+            cached = " • cached" if result["cached"] else ""
+            self.model_info_label.setText(f"{model_name} • {result['words']} words processed{cached}")
+            
+            timings = result["timings"]
+            self.stage_timing_label.setText(" • ".join(
+                f"{label} {timings[stage] * 1000:.1f} ms" for stage, label in STAGE_LABELS if stage in timings))
             
             bar_width = int(confidence * 2.5)
             animation = QPropertyAnimation(self.confidence_bar, b"geometry")
@@ -533,31 +901,144 @@ class SpamClassifierApp(QWidget):
                 }}
             """)
             
+            self.finish_loading()
+            
         except Exception as e:
-            self.prediction_label.setText("Classification Error")
-            self.prediction_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ef4444;")
+            self.show_classification_error(str(e))
+            
+    def show_classification_error(self, error):
+        self.prediction_label.setText("Classification Error")
+        self.prediction_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #ef4444;")
+        
+        self.confidence_label.setText("Error occurred")
+        self.confidence_label.setStyleSheet("font-size: 14px; color: #ef4444; font-weight: bold;")
+        
+        self.status_label.setText(f"Error: {error[:50]}...")
+        self.status_label.setStyleSheet("""
+            QLabel {
+                font-size: 12px; 
+                color: #ef4444; 
+                font-weight: bold; 
+                background-color: white; 
+                padding: 6px; 
+                border-radius: 6px; 
+                border: 1px solid #e2e8f0;
+            }
+        """)
+        self.finish_loading()
             
-            self.confidence_label.setText("Error occurred")
-            self.confidence_label.setStyleSheet("font-size: 14px; color: #ef4444; font-weight: bold;")
+    def finish_loading(self):
+        self.active_worker = None
+        self.classify_btn.setText("Classify Message")
+        self.loading_spinner.hide()
+        self.loading_spinner._timer.stop()
+        
+    def open_bulk_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Classify messages from file", "", BULK_FILE_FILTER)
+        if path:
+            self.start_bulk(path)
             
-            self.status_label.setText(f"Error: {str(e)[:50]}...")
-            self.status_label.setStyleSheet("""
-                QLabel {
-                    font-size: 12px; 
-                    color: #ef4444; 
-                    font-weight: bold; 
-                    background-color: white; 
-                    padding: 6px; 
-                    border-radius: 6px; 
-                    border: 1px solid #e2e8f0;
-                }
-            """)
+    def start_bulk(self, path):
+        self.cancel_bulk()
+        
+        model_key = MODEL_KEYS[self.current_model]
+        self.bulk_job_id += 1
+        worker = BulkClassificationWorker(self.bulk_job_id, path, model_key)
+        worker.signals.started.connect(self.on_bulk_started)
+        worker.signals.rows.connect(self.on_bulk_rows)
+        worker.signals.finished.connect(self.on_bulk_finished)
+        worker.signals.failed.connect(self.on_bulk_failed)
+        self.bulk_worker = worker
+        
+        self.results_model.clear(path)
+        self.bulk_total = 0
+        self.bulk_started_at = time.perf_counter()
+        self.bulk_title.setText(f"File Results • {os.path.basename(path)}")
+        # Busy indicator until the worker has counted the messages
+        self.bulk_progress.setRange(0, 0)
+        self.throughput_label.setText("Reading file...")
+        self.cancel_bulk_btn.setEnabled(True)
+        self.export_btn.setEnabled(False)
+        self.open_file_btn.setEnabled(False)
+        if not self.bulk_frame.isVisible():
+            self.bulk_frame.setVisible(True)
+            self.resize(self.width(), max(self.height(), 900))
+        self.status_label.setText(f"Classifying file with {MODEL_NAMES[model_key]}...")
+        
+        self.thread_pool.start(worker)
+        
+    def cancel_bulk(self):
+        if self.bulk_worker is not None:
+            self.bulk_worker.cancel()
+            self.cancel_bulk_btn.setEnabled(False)
+            self.throughput_label.setText("Cancelling...")
             
-        finally:
-            self.classify_btn.setEnabled(True)
-            self.classify_btn.setText("Classify Message")
-            self.loading_spinner.hide()
-            self.loading_spinner._timer.stop()
+    def on_bulk_started(self, job_id, total):
+        if job_id != self.bulk_job_id:
+            return
+        self.bulk_total = total
+        self.bulk_started_at = time.perf_counter()
+        self.bulk_progress.setRange(0, max(total, 1))
+        self.bulk_progress.setValue(0)
+        self.update_throughput()
+        
+    def on_bulk_rows(self, job_id, rows):
+        if job_id != self.bulk_job_id:
+            return
+        self.results_model.append_rows(rows)
+        self.bulk_progress.setValue(self.results_model.rowCount())
+        self.update_throughput()
+        
+    def update_throughput(self):
+        done = self.results_model.rowCount()
+        elapsed = time.perf_counter() - self.bulk_started_at
+        rate = done / elapsed if elapsed > 0 else 0.0
+        self.throughput_label.setText(f"{done:,} / {self.bulk_total:,} messages • {rate:,.0f} msgs/s • "
+                                      f"{self.results_model.spam:,} spam")
+        
+    def on_bulk_finished(self, job_id, cancelled):
+        if job_id != self.bulk_job_id:
+            return
+        self.bulk_worker = None
+        done = self.results_model.rowCount()
+        if cancelled:
+            self.bulk_progress.setRange(0, max(self.bulk_total, 1))
+            self.status_label.setText(f"File classification cancelled after {done:,} messages")
+        else:
+            self.bulk_progress.setValue(self.bulk_progress.maximum())
+            self.status_label.setText(f"File classified • {done:,} messages, {self.results_model.spam:,} spam")
+        self.update_throughput()
+        self.finish_bulk()
+        
+    def on_bulk_failed(self, job_id, error):
+        if job_id != self.bulk_job_id:
+            return
+        self.bulk_worker = None
+        self.bulk_progress.setRange(0, 1)
+        self.throughput_label.setText("")
+        self.status_label.setText(f"Error: {error[:80]}")
+        self.finish_bulk()
+        
+    def finish_bulk(self):
+        self.cancel_bulk_btn.setEnabled(False)
+        self.open_file_btn.setEnabled(True)
+        self.export_btn.setEnabled(self.results_model.rowCount() > 0)
+        
+    def export_results(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export results", "results.csv", "CSV files (*.csv)")
+        if not path:
+            return
+        try:
+            self.results_model.export_csv(path)
+            self.status_label.setText(f"Exported {self.results_model.rowCount():,} results to {path}")
+        except OSError as e:
+            self.status_label.setText(f"Export failed: {e}")
+            
+    def closeEvent(self, event):
+        # Stop a running file job instead of letting it finish in the background
+        if self.bulk_worker is not None:
+            self.bulk_worker.cancel()
+        super().closeEvent(event)
 
 # -----------------------------
 # Run App
@@ -571,4 +1052,14 @@ if __name__ == "__main__":
     window = SpamClassifierApp()
     window.show()
     
+    # Load the default model in the background while the window is idle
+    models.prefetch(VECTORIZER_KEY, MODEL_KEYS[window.current_model])
+    models.watch()
+    
+    if "--measure-startup" in sys.argv:
+        # Read by benchmarks/startup_time.py
+        startup_ms = (time.perf_counter() - _START_TIME) * 1000
+        print(f"Startup: window shown in {startup_ms:.0f} ms", file=sys.stderr)
+        sys.exit(0)
+    
     sys.exit(app.exec_())
\ No newline at end of file
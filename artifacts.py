@@ -0,0 +1,355 @@
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+from inference import COMPACT_MANIFEST, MODEL_DIR, MODEL_FILES, load_model, load_vectorizer
+from linear_model import LinearScorer
+
+# -----------------------------
+# Compact Artifact Format
+# -----------------------------
+# One directory with a JSON manifest and one .npy file per array. Arrays are
+# opened with mmap_mode="r", so loading is near-instant, processes share the
+# page cache, and nothing is unpickled.
+COMPACT_DIR, MANIFEST_FILE = os.path.split(COMPACT_MANIFEST)
+FORMAT_VERSION = 1
+
+# Storage types for weight arrays; int8 is affine per row and dequantized to
+# float32 on load, float16 is widened to float32 on load
+WEIGHT_DTYPES = ("float32", "float16", "int8")
+
+# TfidfVectorizer settings the compact vectorizer reproduces exactly
+SUPPORTED_VECTORIZER_PARAMS = {
+    "analyzer": "word",
+    "ngram_range": (1, 1),
+    "binary": False,
+    "stop_words": None,
+    "strip_accents": None,
+    "preprocessor": None,
+    "tokenizer": None,
+    "use_idf": True,
+}
+
+
+class CompactVectorizer:
+    def __init__(self, vocabulary, idf, lowercase=True, token_pattern=r"(?u)\b\w\w+\b", norm="l2",
+                 sublinear_tf=False):
+        # Tokens are looked up with a binary search on the (memory-mapped) term
+        # array, so no per-process {term: index} dict is built and the
+        # vocabulary pages stay shared between workers
+        # np.asarray keeps a memmap's pages but drops its slow subclass indexing
+        self.terms = np.asarray(vocabulary) if getattr(vocabulary, "dtype", None) is not None \
+            and vocabulary.dtype.kind == "U" else np.asarray(vocabulary, dtype=str)
+        self.idf = idf
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.token_pattern = token_pattern
+        self._findall = re.compile(token_pattern).findall
+        # get_feature_names_out() is sorted; other orders get a sorted view
+        if len(self.terms) > 1 and not np.all(self.terms[:-1] < self.terms[1:]):
+            self._order = np.argsort(self.terms, kind="stable")
+            self._sorted = self.terms[self._order]
+        else:
+            self._order = None
+            self._sorted = self.terms
+        self._max_len = max(self.terms.dtype.itemsize // 4, 1)
+
+    def lookup(self, tokens):
+        # Column index of each token, -1 where it is not in the vocabulary
+        tokens = np.array(tokens, dtype=f"<U{self._max_len}")
+        positions = np.searchsorted(self._sorted, tokens)
+        positions[positions == len(self._sorted)] = 0
+        found = self._sorted[positions] == tokens
+        if self._order is not None:
+            positions = self._order[positions]
+        return np.where(found, positions, -1)
+
+    def transform(self, texts):
+        from scipy import sparse
+
+        findall = self._findall
+        max_len = self._max_len
+        tokens, rows = [], []
+        n_rows = 0
+        for text in texts:
+            if self.lowercase:
+                text = text.lower()
+            # Longer tokens cannot be terms and would only widen the lookup array
+            row_tokens = [t for t in findall(text) if len(t) <= max_len]
+            tokens.extend(row_tokens)
+            rows.extend([n_rows] * len(row_tokens))
+            n_rows += 1
+
+        # One sorted (row, column) key per known token; unique() gives the counts
+        n_terms = len(self.terms)
+        columns = self.lookup(tokens) if tokens else np.empty(0, dtype=np.int64)
+        known = columns >= 0
+        keys, counts = np.unique(np.asarray(rows, dtype=np.int64)[known] * n_terms + columns[known],
+                                 return_counts=True)
+        indptr = np.searchsorted(keys, np.arange(n_rows + 1, dtype=np.int64) * n_terms)
+        X = sparse.csr_matrix((counts.astype(np.float64), (keys % n_terms).astype(np.int32),
+                               indptr.astype(np.int32)), shape=(n_rows, n_terms))
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        X.data *= self.idf[X.indices]
+        if self.norm == "l2":
+            row_nnz = np.diff(X.indptr)
+            nonempty = row_nnz > 0
+            if X.nnz:
+                norms = np.sqrt(np.add.reduceat(X.data ** 2, X.indptr[:-1][nonempty]))
+                X.data /= np.repeat(norms, row_nnz[nonempty])
+        elif self.norm is not None:
+            raise ValueError(f"Unsupported norm '{self.norm}'")
+        return X
+
+
+class CompactNB:
+    def __init__(self, feature_log_prob, class_log_prior, classes):
+        self.feature_log_prob = feature_log_prob
+        self.class_log_prior = class_log_prior
+        self.classes_ = np.asarray(classes)
+
+    def predict_with_proba(self, X):
+        jll = np.asarray(X @ self.feature_log_prob.T) + self.class_log_prior
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return self.classes_[proba.argmax(axis=1)], proba
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+# -----------------------------
+# Export
+# -----------------------------
+def _save_array(output_dir, name, array):
+    # Written beside the target and renamed over it, like the manifest. Saving
+    # in place would truncate the inode that running processes have mapped
+    filename = f"{name}.npy"
+    tmp_path = os.path.join(output_dir, filename + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, os.path.join(output_dir, filename))
+    return filename
+
+
+def quantize_int8(array):
+    rows = np.atleast_2d(np.asarray(array, dtype=np.float64))
+    low = rows.min(axis=1)
+    scale = (rows.max(axis=1) - low) / 255
+    scale[scale == 0] = 1.0
+    values = np.round((rows - low[:, None]) / scale[:, None]) - 128
+    return values.astype(np.int8).reshape(np.shape(array)), scale, low
+
+
+def dequantize_int8(values, scale, low):
+    rows = np.atleast_2d(values).astype(np.float32)
+    rows = (rows + 128) * scale[:, None].astype(np.float32) + low[:, None].astype(np.float32)
+    return rows.reshape(values.shape)
+
+
+def save_weights(output_dir, spec, name, stem, array, dtype="float32"):
+    if dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"Unknown weight dtype '{dtype}', expected one of {WEIGHT_DTYPES}")
+    if dtype == "int8":
+        values, scale, low = quantize_int8(array)
+        spec["arrays"][name] = _save_array(output_dir, stem, values)
+        spec.setdefault("quantized", {})[name] = {"scale": _save_array(output_dir, f"{stem}.scale", scale),
+                                                  "low": _save_array(output_dir, f"{stem}.low", low)}
+    else:
+        spec["arrays"][name] = _save_array(output_dir, stem, np.asarray(array).astype(dtype))
+    return spec
+
+
+def _check_vectorizer(tfid):
+    params = tfid.get_params()
+    for name, expected in SUPPORTED_VECTORIZER_PARAMS.items():
+        value = tuple(params[name]) if isinstance(params[name], list) else params[name]
+        if value != expected:
+            raise ValueError(f"Cannot export TfidfVectorizer with {name}={params[name]!r}")
+    return params
+
+
+def to_compact_vectorizer(tfid):
+    if isinstance(tfid, CompactVectorizer):
+        return tfid
+    params = _check_vectorizer(tfid)
+    return CompactVectorizer(tfid.get_feature_names_out(), tfid.idf_.astype(np.float64), params["lowercase"],
+                             params["token_pattern"], params["norm"], params["sublinear_tf"])
+
+
+def export_vectorizer(tfid, output_dir):
+    params = _check_vectorizer(tfid)
+    terms = [None] * len(tfid.vocabulary_)
+    for term, index in tfid.vocabulary_.items():
+        terms[index] = term
+    return {
+        "lowercase": params["lowercase"],
+        "token_pattern": params["token_pattern"],
+        "norm": params["norm"],
+        "sublinear_tf": params["sublinear_tf"],
+        "arrays": {
+            "vocabulary": _save_array(output_dir, "tfidf.vocabulary", np.array(terms, dtype=str)),
+            "idf": _save_array(output_dir, "tfidf.idf", tfid.idf_.astype(np.float64)),
+        },
+    }
+
+
+def export_model(key, model, output_dir, X_cal=None, y_cal=None):
+    if hasattr(model, "feature_log_prob_"):
+        return {
+            "type": "multinomial_nb",
+            "classes": [int(c) for c in model.classes_],
+            "arrays": {
+                "feature_log_prob": _save_array(output_dir, f"{key}.feature_log_prob", model.feature_log_prob_),
+                "class_log_prior": _save_array(output_dir, f"{key}.class_log_prior", model.class_log_prior_),
+            },
+        }
+    if not isinstance(model, LinearScorer) and getattr(model, "coef_", None) is not None \
+            and not hasattr(model, "support_vectors_"):
+        model = LinearScorer.from_estimator(model, X_cal, y_cal)
+    if isinstance(model, LinearScorer):
+        return {
+            "type": "linear",
+            "intercept": model.intercept,
+            "slope": model.slope,
+            "offset": model.offset,
+            "arrays": {"coef": _save_array(output_dir, f"{key}.coef", model.coef)},
+        }
+    raise ValueError(f"{type(model).__name__} has no flat-array form, use the 'linear' model instead")
+
+
+def _write_manifest(output_dir, manifest):
+    # Written last, so readers never see a manifest pointing at missing arrays
+    tmp_path = os.path.join(output_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_FILE))
+
+
+def convert(model_dir=MODEL_DIR, output_dir=None):
+    output_dir = output_dir or os.path.join(model_dir, COMPACT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tfid = load_vectorizer(model_dir, compact=False)
+    manifest = {"format": FORMAT_VERSION, "vectorizer": export_vectorizer(tfid, output_dir), "models": {}}
+    for key in MODEL_FILES:
+        if not os.path.exists(os.path.join(model_dir, MODEL_FILES[key])):
+            continue
+        try:
+            manifest["models"][key] = export_model(key, load_model(key, model_dir, compact=False), output_dir)
+            print(f"Exported {key}")
+        except ValueError as e:
+            print(f"Skipped {key}: {e}")
+
+    _write_manifest(output_dir, manifest)
+    return manifest
+
+
+def export_compressed(vectorizer, models, output_dir, dtype="float32", info=None):
+    # Takes the in-memory compact forms built by compress.py. The vocabulary is
+    # one newline-joined UTF-8 buffer (terms never contain whitespace) instead
+    # of fixed-width strings padded to the longest term
+    os.makedirs(output_dir, exist_ok=True)
+    terms = np.frombuffer("\n".join(map(str, vectorizer.terms)).encode("utf-8"), dtype=np.uint8)
+    spec = {
+        "lowercase": vectorizer.lowercase,
+        "token_pattern": vectorizer.token_pattern,
+        "norm": vectorizer.norm,
+        "sublinear_tf": vectorizer.sublinear_tf,
+        "arrays": {"vocabulary": _save_array(output_dir, "tfidf.vocabulary", terms)},
+    }
+    save_weights(output_dir, spec, "idf", "tfidf.idf", vectorizer.idf, dtype)
+    manifest = {"format": FORMAT_VERSION, "compression": dict(info or {}, dtype=dtype), "vectorizer": spec,
+                "models": {}}
+
+    for key, model in models.items():
+        if isinstance(model, CompactNB):
+            spec = {
+                "type": "multinomial_nb",
+                "classes": [int(c) for c in model.classes_],
+                "arrays": {"class_log_prior": _save_array(output_dir, f"{key}.class_log_prior",
+                                                          np.asarray(model.class_log_prior, dtype=np.float64))},
+            }
+            save_weights(output_dir, spec, "feature_log_prob", f"{key}.feature_log_prob", model.feature_log_prob, dtype)
+        elif isinstance(model, LinearScorer):
+            spec = {"type": "linear", "intercept": model.intercept, "slope": model.slope, "offset": model.offset,
+                    "arrays": {}}
+            save_weights(output_dir, spec, "coef", f"{key}.coef", model.coef, dtype)
+        else:
+            raise ValueError(f"{type(model).__name__} has no flat-array form")
+        manifest["models"][key] = spec
+
+    _write_manifest(output_dir, manifest)
+    return manifest
+
+# -----------------------------
+# Import
+# -----------------------------
+def read_manifest(model_dir=MODEL_DIR):
+    with open(os.path.join(model_dir, COMPACT_DIR, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact artifact format {manifest.get('format')}")
+    return manifest
+
+
+def _load_arrays(model_dir, spec):
+    base = os.path.join(model_dir, COMPACT_DIR)
+    arrays = {name: np.load(os.path.join(base, filename), mmap_mode="r", allow_pickle=False)
+              for name, filename in spec["arrays"].items()}
+    # Compressed exports (compress.py) are small, so widening them in memory is cheap
+    for name, files in spec.get("quantized", {}).items():
+        scale, low = (np.load(os.path.join(base, files[part]), allow_pickle=False) for part in ("scale", "low"))
+        arrays[name] = dequantize_int8(arrays[name], scale, low)
+    for name, array in arrays.items():
+        if array.dtype == np.float16:
+            arrays[name] = array.astype(np.float32)
+    return arrays
+
+
+def load_compact_vectorizer(model_dir=MODEL_DIR):
+    spec = read_manifest(model_dir)["vectorizer"]
+    arrays = _load_arrays(model_dir, spec)
+    vocabulary = arrays["vocabulary"]
+    if vocabulary.dtype == np.uint8:
+        vocabulary = np.array(vocabulary.tobytes().decode("utf-8").split("\n"))
+    return CompactVectorizer(vocabulary, arrays["idf"], spec["lowercase"], spec["token_pattern"],
+                             spec["norm"], spec["sublinear_tf"])
+
+
+def load_compact_model(key, model_dir=MODEL_DIR):
+    models = read_manifest(model_dir)["models"]
+    if key not in models:
+        raise KeyError(key)
+    spec = models[key]
+    arrays = _load_arrays(model_dir, spec)
+    if spec["type"] == "multinomial_nb":
+        return CompactNB(arrays["feature_log_prob"], arrays["class_log_prior"], spec["classes"])
+    if spec["type"] == "linear":
+        return LinearScorer(arrays["coef"], spec["intercept"], spec["slope"], spec["offset"])
+    raise ValueError(f"Unknown compact model type '{spec['type']}'")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert best_models/ pickles to the compact .npy format.")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--output-dir", help=f"Defaults to <model-dir>/{COMPACT_DIR}")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    convert(args.model_dir, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
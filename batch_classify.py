@@ -0,0 +1,227 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+import metrics
+from datasets import TEXT_COLUMNS, iter_csv_messages
+from inference import MODEL_NAMES, classify_texts, load_model, load_vectorizer
+from mail_ingest import count_maildir, count_mbox, is_maildir, iter_maildir_messages, iter_mbox_messages
+from prefilter import Prefilter, classify_with_prefilter, load_rules
+from preprocessing import (DEFAULT_TOKENIZER, MAX_CHARS, MAX_TOKENS, TOKENIZERS, ParallelPreprocessor, set_limits,
+                           set_tokenizer, transform_texts)
+
+# -----------------------------
+# Input Readers
+# -----------------------------
+JSON_TEXT_KEYS = ("text", "message") + TEXT_COLUMNS
+CHUNK_SIZE = 1000
+
+
+def iter_jsonl_messages(path):
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            for key in JSON_TEXT_KEYS:
+                if key in record:
+                    yield record[key], None
+                    break
+            else:
+                raise ValueError(f"{path}:{line_no}: no message field, expected one of {JSON_TEXT_KEYS}")
+
+
+READERS = {
+    ".csv": iter_csv_messages,
+    ".jsonl": iter_jsonl_messages,
+    ".json": iter_jsonl_messages,
+    ".mbox": iter_mbox_messages,
+    ".maildir": iter_maildir_messages,
+}
+
+
+def count_csv_records(path):
+    # Rows are split by the csv module, but no fields are decoded into messages
+    with open(path, encoding="utf-8", newline="") as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def count_jsonl_records(path):
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+# Record counts without parsing messages, e.g. for a progress bar's range
+COUNTERS = {
+    ".csv": count_csv_records,
+    ".jsonl": count_jsonl_records,
+    ".json": count_jsonl_records,
+    ".mbox": count_mbox,
+    ".maildir": count_maildir,
+}
+
+
+def _input_format(path, fmt=None):
+    if not fmt and os.path.isdir(path):
+        if not is_maildir(path):
+            raise ValueError(f"{path} is a directory but not a maildir (no cur/ or new/)")
+        fmt = "maildir"
+    fmt = fmt or os.path.splitext(path)[1].lower()
+    if not fmt.startswith("."):
+        fmt = "." + fmt
+    if fmt not in READERS:
+        raise ValueError(f"Unsupported input format '{fmt}', expected one of {sorted(READERS)}")
+    return fmt
+
+
+def open_reader(path, fmt=None):
+    return READERS[_input_format(path, fmt)](path)
+
+
+def count_records(path, fmt=None):
+    return COUNTERS[_input_format(path, fmt)](path)
+
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+# -----------------------------
+# Output Writers
+# -----------------------------
+OUTPUT_FIELDS = ["index", "prediction", "confidence", "spam_probability", "label"]
+
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, row):
+        self.f.write(json.dumps(row) + "\n")
+
+# -----------------------------
+# Batch Classification
+# -----------------------------
+def classify_stream(messages, vectorizer, model, chunk_size=CHUNK_SIZE, preprocess=transform_texts, model_key=None,
+                    prefilter=None):
+    def classify(texts):
+        return classify_texts(vectorizer, model, preprocess(texts), model_key)
+
+    index = 0
+    for chunk in iter_chunks(messages, chunk_size):
+        texts = [text for text, _ in chunk]
+        if prefilter is not None:
+            predictions, probabilities = classify_with_prefilter(prefilter, texts, classify)
+        else:
+            predictions, probabilities = classify(texts)
+        for (_, label), prediction, proba in zip(chunk, predictions, probabilities):
+            yield {
+                "index": index,
+                "prediction": "spam" if prediction == 1 else "ham",
+                "confidence": round(float(proba[int(prediction)]), 6),
+                "spam_probability": round(float(proba[1]), 6),
+                "label": "" if label is None else ("spam" if label == 1 else "ham"),
+            }
+            index += 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Classify a CSV/JSONL/mbox file or a maildir of messages in streaming chunks.")
+    parser.add_argument("input", help="Input file (.csv, .jsonl or .mbox) or maildir directory")
+    parser.add_argument("-o", "--output", help="Output file (.csv or .jsonl), defaults to CSV on stdout")
+    parser.add_argument("-m", "--model", choices=sorted(MODEL_NAMES), default="nb")
+    parser.add_argument("-f", "--format", help="Force the input format (csv, jsonl, mbox, maildir)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--model-dir", default="best_models")
+    parser.add_argument("--prefilter", nargs="?", const="", metavar="RULES",
+                        help="Settle obvious spam with keyword/URL rules first (optional JSON rules file)")
+    parser.add_argument("--metrics", help="Write per-stage metrics in Prometheus text format to this file")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Preprocessing processes (0 = one per core)")
+    parser.add_argument("--tokenizer", choices=TOKENIZERS, default=DEFAULT_TOKENIZER,
+                        help="regex (no punkt data needed) or nltk (word_tokenize, as the models were first trained)")
+    parser.add_argument("--max-chars", type=int, default=MAX_CHARS,
+                        help="Characters of each message that are scored, the rest is ignored")
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS, help="Tokens of each message that are scored")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_tokenizer(args.tokenizer)
+    set_limits(args.max_chars, args.max_tokens)
+    if args.metrics:
+        metrics.enable()
+    try:
+        vectorizer = load_vectorizer(args.model_dir)
+        model = load_model(args.model, args.model_dir)
+    except FileNotFoundError as e:
+        raise SystemExit(f"Cannot load model '{args.model}' from {args.model_dir}: {e.filename} not found")
+    except ValueError as e:
+        raise SystemExit(f"Cannot load model '{args.model}' from {args.model_dir}: {e}")
+
+    prefilter = Prefilter(load_rules(args.prefilter)) if args.prefilter is not None else None
+    pool = ParallelPreprocessor(workers=args.workers) if args.workers != 1 else None
+    preprocess = pool.transform_texts if pool else transform_texts
+
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.output and args.output.endswith(".jsonl"):
+            writer = JsonlWriter(out)
+        else:
+            writer = CsvWriter(out)
+
+        start = time.perf_counter()
+        count = 0
+        spam = 0
+        rows = classify_stream(open_reader(args.input, args.format), vectorizer, model,
+                               args.chunk_size, preprocess, args.model, prefilter)
+        for row in rows:
+            writer.write(row)
+            count += 1
+            spam += row["prediction"] == "spam"
+            if count % args.chunk_size == 0:
+                out.flush()
+        elapsed = time.perf_counter() - start
+    finally:
+        if pool:
+            pool.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics.active().render_prometheus())
+
+    rate = count / elapsed if elapsed else 0.0
+    throughput = f"{rate:.0f} msgs/s"
+    if os.path.isfile(args.input) and elapsed:
+        throughput += f", {os.path.getsize(args.input) / elapsed / 1e6:.1f} MB/s"
+    print(f"Classified {count} messages ({spam} spam) in {elapsed:.2f}s • {throughput}", file=sys.stderr)
+    if prefilter is not None:
+        stats = prefilter.stats()
+        print(f"Pre-filter settled {stats['prefilter_fraction']:.1%} of messages "
+              f"({stats['settled_spam']} spam, {stats['settled_ham']} ham), "
+              f"model scored {stats['model_fraction']:.1%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datasets import DATASETS, iter_csv_messages
+from inference import MODEL_FILES, MODEL_DIR, feature_vectorizer, load_model, load_vectorizer, predict
+from preprocessing import transform_texts
+
+# -----------------------------
+# Hot-path Benchmark Suite
+# -----------------------------
+BATCH_SIZES = [1, 32, 256, 1024]
+MAX_MESSAGES = 2000
+LONG_EMAIL_CHARS = 20000
+TOLERANCE = 0.2
+
+
+def load_inputs(max_messages, long_count, seed=2):
+    inputs = {}
+    pool = []
+    for path in DATASETS:
+        texts = [text for text, _ in iter_csv_messages(path)]
+        pool.extend(texts)
+        inputs[os.path.splitext(os.path.basename(path))[0]] = texts[:max_messages]
+
+    # Synthetic newsletters built from real messages
+    rng = random.Random(seed)
+    long_emails = []
+    for _ in range(long_count):
+        parts, size = [], 0
+        while size < LONG_EMAIL_CHARS:
+            parts.append(rng.choice(pool))
+            size += len(parts[-1]) + 1
+        long_emails.append("\n".join(parts))
+    inputs["long_emails"] = long_emails
+    return inputs
+
+
+def length(items):
+    # Lists of texts or sparse matrices of vectors
+    return items.shape[0] if hasattr(items, "shape") else len(items)
+
+
+def batches(items, size):
+    return [items[i:i + size] for i in range(0, length(items), size)]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(stage_fn, items, batch_size):
+    latencies = []
+    count = 0
+    start = time.perf_counter()
+    for batch in batches(items, batch_size):
+        t = time.perf_counter()
+        stage_fn(batch)
+        latencies.append((time.perf_counter() - t) * 1000)
+        count += length(batch)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    stage_fn(items[:batch_size])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "messages": count,
+        "msgs_per_s": count / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "peak_kb": peak / 1024,
+    }
+
+
+def run(inputs, batch_sizes, model_dir):
+    vectorizer = load_vectorizer(model_dir)
+    models = {}
+    for key in MODEL_FILES:
+        try:
+            models[key] = load_model(key, model_dir)
+        except FileNotFoundError:
+            print(f"Skipping {key}: {MODEL_FILES[key]} not found")
+
+    results = []
+    print(f"{'dataset':<12}{'stage':<16}{'batch':>6}{'throughput':>19}{'p50':>10}{'p95':>10}{'p99':>13}{'peak':>13}")
+    for dataset, texts in inputs.items():
+        transformed = transform_texts(texts)
+        stages = [
+            ("preprocess", transform_texts, texts),
+            ("vectorize", vectorizer.transform, transformed),
+        ] + [(f"predict:{key}", lambda X, m=model: predict(m, X), feature_vectorizer(model, vectorizer).transform(transformed))
+             for key, model in models.items()]
+
+        for stage, fn, items in stages:
+            for batch_size in batch_sizes:
+                row = {"dataset": dataset, "stage": stage, "batch_size": batch_size}
+                row.update(measure(fn, items, batch_size))
+                results.append(row)
+                print(f"{dataset:<12}{stage:<16}{batch_size:>6}{row['msgs_per_s']:>12.0f} msgs/s"
+                      f"{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f} ms"
+                      f"{row['peak_kb']:>10.0f} KB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    reference = {(r["dataset"], r["stage"], r["batch_size"]): r for r in baseline["results"]}
+    regressions = []
+    for row in results:
+        base = reference.get((row["dataset"], row["stage"], row["batch_size"]))
+        if base is None:
+            continue
+        name = f"{row['dataset']}/{row['stage']}/{row['batch_size']}"
+        if base["msgs_per_s"] and row["msgs_per_s"] < base["msgs_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['msgs_per_s']:.0f} -> {row['msgs_per_s']:.0f} msgs/s")
+        if base["p95_ms"] and row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.3f} -> {row['p95_ms']:.3f} ms")
+        if base["peak_kb"] and row["peak_kb"] > base["peak_kb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {base['peak_kb']:.0f} -> {row['peak_kb']:.0f} KB")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing, vectorization and inference.")
+    parser.add_argument("-o", "--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous JSON run and flag regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed relative slowdown (0.2 = 20%%)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--max-messages", type=int, default=MAX_MESSAGES, help="Messages per bundled dataset")
+    parser.add_argument("--long-emails", type=int, default=50, help="Synthetic long emails to generate")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    inputs = load_inputs(args.max_messages, args.long_emails)
+    results = run(inputs, args.batch_sizes, args.model_dir)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
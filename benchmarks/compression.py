@@ -0,0 +1,111 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from artifacts import (WEIGHT_DTYPES, export_compressed, load_compact_model, load_compact_vectorizer,
+                       to_compact_vectorizer)
+from compress import SELECTION_METHODS, feature_scores, prune_model, prune_vectorizer, select_features
+from datasets import DATASETS
+from inference import predict
+from linear_model import fit_linear_svm
+from train import MAX_FEATURES, load_corpus
+
+# -----------------------------
+# Accuracy vs size vs latency
+# -----------------------------
+# Every variant is fitted on the same training split and scored on held-out
+# messages of each dataset, after a round trip through the exported files so
+# quantization error is included.
+SIZES = [3000, 2000, 1000, 500, 250]
+
+
+def split_datasets(paths):
+    from sklearn.model_selection import train_test_split
+
+    train_texts, train_labels, tests = [], [], {}
+    for path in paths:
+        corpus = load_corpus([path])
+        X_train, X_test, y_train, y_test = train_test_split(
+            corpus["transformed"], corpus["labels"], test_size=0.2, random_state=2, stratify=corpus["labels"])
+        train_texts += X_train
+        train_labels += y_train
+        tests[os.path.basename(path)] = (X_test, np.asarray(y_test))
+    # Both files share messages; none of a test split may be trained on
+    held_out = {text for texts, _ in tests.values() for text in texts}
+    keep = [i for i, text in enumerate(train_texts) if text not in held_out]
+    return [train_texts[i] for i in keep], np.asarray([train_labels[i] for i in keep]), tests
+
+
+def dir_bytes(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path))
+
+
+def latency_ms(vectorizer, model, texts, runs):
+    times = []
+    for i in range(runs):
+        start = time.perf_counter()
+        predict(model, vectorizer.transform([texts[i % len(texts)]]))
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def throughput(vectorizer, model, texts):
+    start = time.perf_counter()
+    predict(model, vectorizer.transform(texts))
+    return len(texts) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy, artifact size and latency of pruned/quantized models.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--methods", nargs="+", choices=SELECTION_METHODS, default=list(SELECTION_METHODS))
+    parser.add_argument("--dtypes", nargs="+", choices=WEIGHT_DTYPES, default=list(WEIGHT_DTYPES))
+    parser.add_argument("--models", nargs="+", choices=["nb", "linear"], default=["nb", "linear"])
+    parser.add_argument("--runs", type=int, default=500, help="Single-message calls for the latency figure")
+    args = parser.parse_args()
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    train_texts, y_train, tests = split_datasets(DATASETS)
+    all_test = [text for texts, _ in tests.values() for text in texts]
+    tfid = TfidfVectorizer(max_features=MAX_FEATURES).fit(train_texts)
+    X_train = tfid.transform(train_texts)
+    full = to_compact_vectorizer(tfid)
+    baselines = {"nb": MultinomialNB().fit(X_train, y_train), "linear": fit_linear_svm(X_train, y_train)}
+    print(f"Trained on {X_train.shape[0]} messages, held out "
+          + ", ".join(f"{len(texts)} of {name}" for name, (texts, _) in tests.items()))
+
+    header = f"{'model':<8}{'method':<7}{'size':>6}{'dtype':>9}" \
+             + "".join(f"{name:>11}" for name in tests) + f"{'bytes':>10}{'p50 ms':>9}{'msgs/s':>9}"
+    with tempfile.TemporaryDirectory() as tmp:
+        for key in args.models:
+            print(f"\n{header}")
+            for method in args.methods:
+                scores = feature_scores(method, X_train, y_train, baselines[key])
+                for size in args.sizes:
+                    keep = select_features(scores, size)
+                    vectorizer = prune_vectorizer(full, keep)
+                    model = prune_model(baselines[key], keep, vectorizer.transform(train_texts), y_train)
+                    for dtype in args.dtypes:
+                        out = os.path.join(tmp, f"{key}-{method}-{size}-{dtype}")
+                        compact_dir = os.path.join(out, "compact")
+                        export_compressed(vectorizer, {key: model}, compact_dir, dtype)
+                        loaded_vectorizer = load_compact_vectorizer(out)
+                        loaded = load_compact_model(key, out)
+
+                        accuracy = "".join(
+                            f"{np.mean(predict(loaded, loaded_vectorizer.transform(texts))[0] == y):>11.4f}"
+                            for texts, y in tests.values())
+                        p50 = latency_ms(loaded_vectorizer, loaded, all_test, args.runs)
+                        rate = throughput(loaded_vectorizer, loaded, all_test)
+                        print(f"{key:<8}{method:<7}{len(keep):>6}{dtype:>9}{accuracy}"
+                              f"{dir_bytes(compact_dir):>10}{p50:>9.3f}{rate:>9.0f}")
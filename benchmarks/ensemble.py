@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ensemble import SHORT_CIRCUIT_THRESHOLD, EnsembleScorer
+from inference import predict
+from linear_model import fit_linear_svm
+from train import MAX_FEATURES, load_corpus
+
+# -----------------------------
+# Ensemble vs single models
+# -----------------------------
+def evaluate(name, model, X, y, runs):
+    from sklearn.metrics import accuracy_score, f1_score
+
+    labels, _ = predict(model, X)
+    start = time.perf_counter()
+    for i in range(runs):
+        predict(model, X[i % X.shape[0]])
+    mean_ms = (time.perf_counter() - start) * 1000 / runs
+    print(f"{name:<34}{accuracy_score(y, labels):>9.4f}{f1_score(y, labels):>8.4f}{mean_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare soft-voting ensembles with their members.")
+    parser.add_argument("--runs", type=int, default=500, help="Single-message calls for the mean latency")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.9, 0.95, SHORT_CIRCUIT_THRESHOLD, 1.01])
+    args = parser.parse_args()
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.model_selection import train_test_split
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.svm import SVC
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    corpus = load_corpus()
+    X_train_text, X_test_text, y_train, y_test = train_test_split(
+        corpus["transformed"], corpus["labels"], test_size=0.2, random_state=2, stratify=corpus["labels"])
+    tfid = TfidfVectorizer(max_features=MAX_FEATURES)
+    X_train = tfid.fit_transform(X_train_text)
+    X_test = tfid.transform(X_test_text)
+
+    members = {
+        "nb": MultinomialNB(alpha=0.1).fit(X_train, y_train),
+        "linear": fit_linear_svm(X_train, y_train),
+        "svc": SVC(probability=True, random_state=2).fit(X_train, y_train),
+    }
+
+    print(f"{'model':<34}{'accuracy':>9}{'f1':>8}{'mean ms':>12}")
+    for key, model in members.items():
+        evaluate(key, model, X_test, y_test, args.runs)
+    for threshold in args.thresholds:
+        ensemble = EnsembleScorer(members, threshold=threshold)
+        evaluate(f"ensemble (short-circuit >= {threshold})", ensemble, X_test, y_test, args.runs)
+        print(f"{'':<4}NB settled {ensemble.stats()['short_circuit_rate']:.1%} of messages")
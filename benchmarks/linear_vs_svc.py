@@ -0,0 +1,68 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inference import predict
+from linear_model import fit_linear_svm
+from train import MAX_FEATURES, load_corpus
+
+# -----------------------------
+# Linear scorer vs kernel SVC
+# -----------------------------
+def latency_ms(model, X, runs):
+    times = []
+    for i in range(runs):
+        row = X[i % X.shape[0]]
+        start = time.perf_counter()
+        predict(model, row)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95)]
+
+
+def throughput(model, X):
+    start = time.perf_counter()
+    predict(model, X)
+    return X.shape[0] / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the linear scorer with a probability-calibrated SVC.")
+    parser.add_argument("--kernel", default="rbf", help="Kernel of the reference SVC")
+    parser.add_argument("--runs", type=int, default=500, help="Single-message calls for the latency figures")
+    args = parser.parse_args()
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics import accuracy_score, f1_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.svm import SVC
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    corpus = load_corpus()
+    X_train_text, X_test_text, y_train, y_test = train_test_split(
+        corpus["transformed"], corpus["labels"], test_size=0.2, random_state=2, stratify=corpus["labels"])
+    tfid = TfidfVectorizer(max_features=MAX_FEATURES)
+    X_train = tfid.fit_transform(X_train_text)
+    X_test = tfid.transform(X_test_text)
+
+    start = time.perf_counter()
+    svc = SVC(kernel=args.kernel, probability=True, random_state=2).fit(X_train, y_train)
+    svc_fit = time.perf_counter() - start
+    start = time.perf_counter()
+    linear = fit_linear_svm(X_train, y_train)
+    linear_fit = time.perf_counter() - start
+
+    print(f"{'model':<22}{'accuracy':>9}{'f1':>8}{'fit s':>8}{'p50 ms':>9}{'p95 ms':>9}{'msgs/s':>10}{'size':>10}")
+    for name, model, fit in ((f"SVC ({args.kernel}, Platt)", svc, svc_fit), ("Linear scorer", linear, linear_fit)):
+        labels, _ = predict(model, X_test)
+        p50, p95 = latency_ms(model, X_test, args.runs)
+        if hasattr(model, "support_vectors_"):
+            size = f"{model.support_vectors_.shape[0]} SVs"
+        else:
+            size = f"{model.coef.nbytes // 1024} KB"
+        print(f"{name:<22}{accuracy_score(y_test, labels):>9.4f}{f1_score(y_test, labels):>8.4f}{fit:>8.1f}"
+              f"{p50:>9.3f}{p95:>9.3f}{throughput(model, X_test):>10.0f}{size:>10}")
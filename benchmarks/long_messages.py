@@ -0,0 +1,59 @@
+import argparse
+import base64
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datasets import load_messages
+from preprocessing import TextPreprocessor
+
+# -----------------------------
+# Pathological message sizes
+# -----------------------------
+def make_inputs(megabytes):
+    texts, _ = load_messages()
+    size = int(megabytes * 1024 * 1024)
+    prose = " ".join(texts)
+    newsletter = (prose * (size // len(prose) + 1))[:size]
+    blob = base64.encodebytes(os.urandom(size * 3 // 4)).decode("ascii")
+    pasted = "Please see the attached invoice, claim your refund now.\n" + blob + "\nThanks"
+    no_spaces = ("winner" * (size // 6 + 1))[:size]
+    return {"newsletter": newsletter, "base64 paste": pasted, "no whitespace": no_spaces}
+
+
+def measure(engine, transform, text):
+    start = time.perf_counter()
+    result = transform(engine, text)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    transform(engine, text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(result.split())
+
+
+def unbounded(engine, text):
+    # What transform_text did before: one token list over the whole body
+    tokens = [t for t in engine.alnum_tokens(text.lower()) if t not in engine.stop_words]
+    return " ".join(engine.stem(t) for t in tokens)
+
+
+def bounded(engine, text):
+    return engine.transform_text(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency and memory of preprocessing huge messages.")
+    parser.add_argument("--megabytes", type=float, default=5)
+    args = parser.parse_args()
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    engine = TextPreprocessor()
+    print(f"{'input':<16}{'mode':<12}{'seconds':>10}{'peak MB':>10}{'terms':>10}")
+    for name, text in make_inputs(args.megabytes).items():
+        for mode, transform in (("unbounded", unbounded), ("limited", bounded)):
+            elapsed, peak, terms = measure(engine, transform, text)
+            print(f"{name:<16}{mode:<12}{elapsed:>10.3f}{peak / 1e6:>10.1f}{terms:>10}")
@@ -0,0 +1,93 @@
+import argparse
+import mailbox
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from batch_classify import classify_stream
+from datasets import load_messages
+from inference import load_model, load_vectorizer
+from mail_ingest import iter_mbox, iter_mbox_messages
+
+# -----------------------------
+# Streaming mbox ingestion vs mailbox.mbox
+# -----------------------------
+def write_mbox(path, texts, attachment_kb):
+    attachment = os.urandom(attachment_kb * 1024)
+    box = mailbox.mbox(path)
+    box.lock()
+    try:
+        for i, text in enumerate(texts):
+            msg = EmailMessage()
+            msg["Subject"] = f"Message {i}"
+            msg.set_content(text)
+            if i % 2:
+                msg.add_alternative(f"<html><body><p>{text}</p></body></html>", subtype="html")
+            if attachment_kb:
+                msg.add_attachment(attachment, maintype="application", subtype="octet-stream", filename="blob.bin")
+            box.add(msg)
+        box.flush()
+    finally:
+        box.unlock()
+        box.close()
+
+
+def stdlib_mbox(path):
+    box = mailbox.mbox(path, create=False)
+    try:
+        for msg in box:
+            body = ""
+            for part in msg.walk():
+                if part.get_content_type() == "text/plain" and not part.get_filename():
+                    body = (part.get_payload(decode=True) or b"").decode("utf-8", errors="replace")
+                    break
+            yield msg.get("Subject", ""), body
+    finally:
+        box.close()
+
+
+def measure(name, make_reader, path, size):
+    start = time.perf_counter()
+    count = sum(1 for _ in make_reader(path))
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc slows allocation down, so peak memory gets its own pass
+    tracemalloc.start()
+    for _ in make_reader(path):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<22}{count:>8}{count / elapsed:>12.0f}{size / elapsed / 1e6:>10.1f}{peak / 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure mbox ingestion throughput and peak memory.")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--attachment-kb", type=int, default=256, help="Binary attachment size per message")
+    parser.add_argument("-m", "--model", default="nb")
+    args = parser.parse_args()
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    texts, _ = load_messages()
+    texts = (texts * (args.messages // len(texts) + 1))[:args.messages]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.mbox")
+        write_mbox(path, texts, args.attachment_kb)
+        size = os.path.getsize(path)
+        print(f"{args.messages} messages, {size / 1e6:.1f} MB mbox\n")
+        print(f"{'reader':<22}{'msgs':>8}{'msgs/s':>12}{'MB/s':>10}{'peak MB':>12}")
+        measure("mailbox.mbox", stdlib_mbox, path, size)
+        measure("mail_ingest.iter_mbox", iter_mbox, path, size)
+
+        vectorizer = load_vectorizer()
+        model = load_model(args.model)
+        start = time.perf_counter()
+        count = sum(1 for _ in classify_stream(iter_mbox_messages(path), vectorizer, model, model_key=args.model))
+        elapsed = time.perf_counter() - start
+        print(f"\nEnd to end ({args.model}): {count / elapsed:.0f} msgs/s, {size / elapsed / 1e6:.1f} MB/s")
@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datasets import DATASETS, load_messages
+from preprocessing import PARALLEL_CHUNK_SIZE, ParallelPreprocessor
+
+# -----------------------------
+# Parallel Preprocessing Scaling
+# -----------------------------
+def run(texts, workers, chunk_size):
+    with ParallelPreprocessor(workers=workers, chunk_size=chunk_size) as pool:
+        # Warm-up spawns the workers and fills their stem caches
+        pool.transform_texts(texts[:chunk_size * workers])
+        start = time.perf_counter()
+        result = pool.transform_texts(texts)
+        elapsed = time.perf_counter() - start
+    return result, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure preprocessing throughput at several worker counts.")
+    parser.add_argument("--chunk-size", type=int, default=PARALLEL_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, nargs="+", help="Worker counts to try (default 1/2/4/N cores)")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeat the corpus to make a larger workload")
+    args = parser.parse_args()
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    texts, _ = load_messages(DATASETS)
+    texts = texts * args.repeat
+
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({w for w in (1, 2, 4, cpus) if w <= cpus})
+
+    baseline = None
+    reference = None
+    print(f"{len(texts)} messages, chunk size {args.chunk_size}")
+    for workers in worker_counts:
+        result, elapsed = run(texts, workers, args.chunk_size)
+        if reference is None:
+            reference, baseline = result, elapsed
+        assert result == reference, f"output differs at {workers} workers"
+        print(f"{workers:>3} workers: {elapsed:6.2f}s  {len(texts) / elapsed:8.0f} msgs/s  "
+              f"speedup {baseline / elapsed:4.1f}x")
@@ -0,0 +1,55 @@
+import os
+import string
+import sys
+import time
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem.porter import PorterStemmer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datasets import DATASETS, iter_csv_messages
+from preprocessing import TextPreprocessor
+
+# -----------------------------
+# Reference implementation (original Front_end.transform_text)
+# -----------------------------
+ps = PorterStemmer()
+
+
+def legacy_transform_text(text):
+    text = text.lower()
+    tokens = nltk.word_tokenize(text)
+    tokens = [t for t in tokens if t.isalnum()]
+    tokens = [t for t in tokens if t not in stopwords.words('english') and t not in string.punctuation]
+    tokens = [ps.stem(t) for t in tokens]
+    return " ".join(tokens)
+
+
+def check(path, engine):
+    texts = [text for text, _ in iter_csv_messages(path)]
+
+    start = time.perf_counter()
+    expected = [legacy_transform_text(t) for t in texts]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = engine.transform_texts(texts)
+    engine_time = time.perf_counter() - start
+
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    print(f"{path}: {len(texts)} messages, {len(mismatches)} mismatches, "
+          f"legacy {legacy_time:.2f}s, engine {engine_time:.2f}s "
+          f"({legacy_time / engine_time:.1f}x)")
+    for i in mismatches[:5]:
+        print(f"  row {i}: {expected[i]!r} != {actual[i]!r}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    engine = TextPreprocessor(tokenizer="nltk")
+    ok = all([check(path, engine) for path in DATASETS])
+    print(engine.cache_info())
+    sys.exit(0 if ok else 1)
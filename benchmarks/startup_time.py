@@ -0,0 +1,44 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# -----------------------------
+# GUI Startup Time
+# -----------------------------
+def measure(env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "Front_end.py", "--measure-startup"], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    for line in result.stderr.splitlines():
+        if line.startswith("Startup:"):
+            return float(line.split(" in ")[1].split()[0]), wall_ms
+    raise RuntimeError(f"No startup line in output:\n{result.stderr}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure time until the classifier window is shown.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="Exit non-zero if the median window time exceeds this")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    window_times, wall_times = [], []
+    for _ in range(args.runs):
+        window_ms, wall_ms = measure(env)
+        window_times.append(window_ms)
+        wall_times.append(wall_ms)
+
+    median = statistics.median(window_times)
+    print(f"window shown: median {median:.0f} ms (min {min(window_times):.0f}, max {max(window_times):.0f})")
+    print(f"process wall: median {statistics.median(wall_times):.0f} ms")
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"REGRESSION: {median:.0f} ms > {args.max_ms:.0f} ms budget")
+        sys.exit(1)
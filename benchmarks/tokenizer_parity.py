@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datasets import DATASETS, iter_csv_messages
+from inference import MODEL_NAMES, load_model, load_vectorizer, predict
+from preprocessing import TextPreprocessor
+
+# -----------------------------
+# Regex tokenizer vs nltk.word_tokenize
+# -----------------------------
+def timed(fn, texts):
+    start = time.perf_counter()
+    result = [fn(text) for text in texts]
+    return result, time.perf_counter() - start
+
+
+def compare(path, engines, vectorizer, models):
+    texts = [text for text, _ in iter_csv_messages(path)]
+    lowered = [text.lower() for text in texts]
+    nltk_engine, regex_engine = engines
+
+    nltk_tokens, nltk_tok_time = timed(nltk_engine.alnum_tokens, lowered)
+    regex_tokens, regex_tok_time = timed(regex_engine.alnum_tokens, lowered)
+    nltk_text, nltk_time = timed(nltk_engine.transform_text, texts)
+    regex_text, regex_time = timed(regex_engine.transform_text, texts)
+
+    token_diffs = [i for i, (a, b) in enumerate(zip(nltk_tokens, regex_tokens)) if a != b]
+    X_nltk = vectorizer.transform(nltk_text)
+    X_regex = vectorizer.transform(regex_text)
+    delta = abs(X_nltk - X_regex)
+    feature_rows = len(set(delta.nonzero()[0]))
+
+    print(f"{path}: {len(texts)} messages")
+    print(f"  tokenize only   nltk {nltk_tok_time:.2f}s  regex {regex_tok_time:.2f}s "
+          f"({nltk_tok_time / regex_tok_time:.1f}x)")
+    print(f"  full preprocess nltk {nltk_time:.2f}s  regex {regex_time:.2f}s ({nltk_time / regex_time:.1f}x)")
+    print(f"  token lists differ on {len(token_diffs)} messages ({len(token_diffs) / len(texts):.2%}), "
+          f"TF-IDF rows differ on {feature_rows}, max |delta| {delta.max() if delta.nnz else 0:.4f}")
+    for key, model in models.items():
+        a, _ = predict(model, X_nltk)
+        b, _ = predict(model, X_regex)
+        print(f"  {key:<9} predictions differ on {int((a != b).sum())} messages")
+    for i in token_diffs[:5]:
+        missing = [t for t in nltk_tokens[i] if t not in regex_tokens[i]]
+        extra = [t for t in regex_tokens[i] if t not in nltk_tokens[i]]
+        print(f"    row {i}: nltk only {missing}, regex only {extra}  {texts[i][:70]!r}")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    engines = (TextPreprocessor(tokenizer="nltk"), TextPreprocessor(tokenizer="regex"))
+    vectorizer = load_vectorizer()
+    models = {}
+    for key in MODEL_NAMES:
+        try:
+            models[key] = load_model(key)
+        except FileNotFoundError:
+            pass
+    for path in DATASETS:
+        compare(path, engines, vectorizer, models)
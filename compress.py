@@ -0,0 +1,151 @@
+import argparse
+import os
+
+import numpy as np
+
+from artifacts import (COMPACT_DIR, WEIGHT_DTYPES, CompactNB, CompactVectorizer, export_compressed,
+                       to_compact_vectorizer)
+from inference import MODEL_DIR, MODEL_FILES, load_model, load_vectorizer
+from linear_model import LinearScorer, fit_linear, fit_linear_svm
+from preprocessing import DEFAULT_TOKENIZER, TOKENIZERS, set_tokenizer
+
+# -----------------------------
+# Feature Selection
+# -----------------------------
+# chi2 ranks terms by how strongly their TF-IDF weight depends on the label,
+# coef by the weight the model itself gives them (|log-odds| for Naive Bayes)
+SELECTION_METHODS = ("chi2", "coef")
+DEFAULT_SIZE = 1000
+
+
+def model_weights(model):
+    if hasattr(model, "feature_log_prob_"):
+        return np.abs(model.feature_log_prob_[1] - model.feature_log_prob_[0])
+    if isinstance(model, CompactNB):
+        return np.abs(model.feature_log_prob[1] - model.feature_log_prob[0])
+    if isinstance(model, LinearScorer):
+        return np.abs(model.coef)
+    if getattr(model, "coef_", None) is not None:
+        return np.abs(np.asarray(model.coef_).ravel())
+    raise ValueError(f"{type(model).__name__} has no per-feature weights, use --method chi2")
+
+
+def feature_scores(method, X=None, y=None, model=None):
+    if method == "chi2":
+        from sklearn.feature_selection import chi2
+
+        scores, _ = chi2(X, y)
+        return np.nan_to_num(scores)
+    if method == "coef":
+        return model_weights(model)
+    raise ValueError(f"Unknown selection method '{method}', expected one of {SELECTION_METHODS}")
+
+
+def select_features(scores, size):
+    # Kept in vocabulary order, so the sliced arrays stay aligned
+    size = min(size, len(scores))
+    return np.sort(np.argsort(scores, kind="stable")[::-1][:size])
+
+# -----------------------------
+# Pruning
+# -----------------------------
+def prune_vectorizer(tfid, keep):
+    tfid = to_compact_vectorizer(tfid)
+    return CompactVectorizer(np.asarray(tfid.terms)[keep], np.asarray(tfid.idf)[keep], tfid.lowercase,
+                             tfid.token_pattern, tfid.norm, tfid.sublinear_tf)
+
+
+def prune_model(model, keep, X=None, y=None):
+    # X must come from prune_vectorizer(...).transform(), i.e. rows normalized
+    # over the kept terms only, exactly as they are served. Without X the
+    # weights are sliced instead; the model then sees rows scaled up by
+    # 1 / (norm of the kept part), which is only close for large sizes.
+    if hasattr(model, "support_vectors_"):
+        # A kernel SVC keeps its support vectors even with kernel="linear"
+        raise ValueError(f"{type(model).__name__} has no flat-array form")
+    if hasattr(model, "feature_log_prob_"):
+        if X is not None:
+            from sklearn.base import clone
+            model = clone(model).fit(X, y)
+            return CompactNB(model.feature_log_prob_, model.class_log_prior_, model.classes_)
+        return CompactNB(model.feature_log_prob_[:, keep], model.class_log_prior_, model.classes_)
+    if isinstance(model, CompactNB):
+        return CompactNB(np.asarray(model.feature_log_prob)[:, keep], model.class_log_prior, model.classes_)
+    if isinstance(model, LinearScorer) or getattr(model, "coef_", None) is not None:
+        if X is not None:
+            if not isinstance(model, LinearScorer):
+                from sklearn.base import clone
+                return fit_linear(clone(model), X, y)
+            # Scorers saved before C was stored are refitted at the LinearSVC default
+            return fit_linear_svm(X, y, C=model.C if model.C is not None else 1.0)
+        if not isinstance(model, LinearScorer):
+            model = LinearScorer.from_estimator(model)
+        return LinearScorer(model.coef[keep], model.intercept, model.slope, model.offset, model.C)
+    raise ValueError(f"{type(model).__name__} has no flat-array form")
+
+
+def compress(model_dir=MODEL_DIR, output_dir=None, size=DEFAULT_SIZE, method="chi2", dtype="float16",
+             refit=True, rank_by="nb"):
+    output_dir = output_dir or os.path.join(model_dir, "compressed")
+    tfid = load_vectorizer(model_dir, compact=False)
+    models = {}
+    for key in MODEL_FILES:
+        if os.path.exists(os.path.join(model_dir, MODEL_FILES[key])):
+            models[key] = load_model(key, model_dir, compact=False)
+
+    corpus = X = y = None
+    if method == "chi2" or refit:
+        from train import load_corpus
+
+        corpus = load_corpus()
+        y = np.asarray(corpus["labels"])
+    if method == "coef" and rank_by not in models:
+        raise ValueError(f"--rank-by model '{rank_by}' not found in {model_dir}")
+    X_full = tfid.transform(corpus["transformed"]) if method == "chi2" else None
+    keep = select_features(feature_scores(method, X_full, y, models.get(rank_by)), size)
+    vectorizer = prune_vectorizer(tfid, keep)
+    if refit:
+        # Refit on the features the export will serve, not slices of full-vocabulary rows
+        X = vectorizer.transform(corpus["transformed"])
+
+    pruned = {}
+    for key, model in models.items():
+        try:
+            pruned[key] = prune_model(model, keep, X, y)
+        except ValueError as e:
+            print(f"Skipped {key}: {e}")
+    info = {"method": method, "size": len(keep), "original_size": len(tfid.vocabulary_), "refit": refit}
+    if method == "coef":
+        info["rank_by"] = rank_by
+    export_compressed(vectorizer, pruned, os.path.join(output_dir, COMPACT_DIR), dtype, info)
+    print(f"Kept {len(keep)} of {len(tfid.vocabulary_)} features ({method}, {dtype}) for "
+          f"{', '.join(pruned) or 'no models'} in {output_dir}")
+    return output_dir
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Shrink the TF-IDF vocabulary and store the weights as float16/int8.")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--output-dir", help="Defaults to <model-dir>/compressed, usable as --model-dir")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Number of features to keep")
+    parser.add_argument("--method", choices=SELECTION_METHODS, default="chi2")
+    parser.add_argument("--rank-by", default="nb", help="Model whose weights rank the features for --method coef")
+    parser.add_argument("--dtype", choices=WEIGHT_DTYPES, default="float16")
+    parser.add_argument("--no-refit", dest="refit", action="store_false",
+                        help="Slice the existing weights instead of refitting; faster, but the model then "
+                             "scores rows renormalized over fewer terms than it was fitted on")
+    parser.add_argument("--tokenizer", choices=TOKENIZERS, default=DEFAULT_TOKENIZER,
+                        help="Tokenizer for the corpus used by chi2 and refitting")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.size < 1:
+        raise SystemExit("--size must be positive")
+    set_tokenizer(args.tokenizer)
+    compress(args.model_dir, args.output_dir, args.size, args.method, args.dtype, args.refit, args.rank_by)
+
+
+if __name__ == "__main__":
+    main()
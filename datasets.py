@@ -0,0 +1,40 @@
+import csv
+
+# -----------------------------
+# Bundled datasets
+# -----------------------------
+DATASETS = ["Data/spam1.csv", "Data/spam2.csv"]
+
+# spam1.csv uses Message,Category while spam2.csv uses Msg,Label
+TEXT_COLUMNS = ("Message", "Msg")
+LABEL_COLUMNS = ("Category", "Label")
+LABELS = {"ham": 0, "spam": 1}
+
+
+def _pick_column(fieldnames, candidates):
+    for name in candidates:
+        if name in fieldnames:
+            return name
+    return None
+
+
+def iter_csv_messages(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        text_col = _pick_column(reader.fieldnames or [], TEXT_COLUMNS)
+        label_col = _pick_column(reader.fieldnames or [], LABEL_COLUMNS)
+        if text_col is None:
+            raise ValueError(f"{path}: no message column, expected one of {TEXT_COLUMNS}")
+
+        for row in reader:
+            label = LABELS.get(row[label_col].strip().lower()) if label_col else None
+            yield row[text_col], label
+
+
+def load_messages(paths=DATASETS):
+    texts, labels = [], []
+    for path in paths:
+        for text, label in iter_csv_messages(path):
+            texts.append(text)
+            labels.append(label)
+    return texts, labels
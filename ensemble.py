@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+
+from inference import predict
+
+# -----------------------------
+# Ensemble Scoring
+# -----------------------------
+# Cheapest member first: its confident answers skip the slower models
+ENSEMBLE_MEMBERS = ["nb", "linear", "svc", "bagging", "adaboost"]
+SHORT_CIRCUIT_THRESHOLD = 0.98
+# One member would just be that model again under another name
+MIN_MEMBERS = 2
+
+
+class EnsembleScorer:
+    def __init__(self, members, weights=None, fast_key="nb", threshold=SHORT_CIRCUIT_THRESHOLD):
+        if not members:
+            raise ValueError("An ensemble needs at least one member model")
+        self.members = dict(members)
+        self.weights = {key: (weights or {}).get(key, 1.0) for key in self.members}
+        self.fast_key = fast_key if fast_key in self.members else None
+        self.threshold = threshold
+        self.classes_ = np.array([0, 1])
+        self.scored = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def predict_with_proba(self, X):
+        n = X.shape[0]
+        total = np.zeros((n, 2))
+        weight = 0.0
+        pending = np.arange(n)
+
+        if self.fast_key is not None:
+            _, fast_proba = predict(self.members[self.fast_key], X)
+            confident = fast_proba.max(axis=1) >= self.threshold
+            total = fast_proba * self.weights[self.fast_key]
+            weight = self.weights[self.fast_key]
+            pending = np.flatnonzero(~confident)
+
+        probabilities = total / weight if weight else total
+        if pending.size:
+            # Soft voting over every member for the rows the fast pass left open
+            subset = X[pending]
+            votes = total[pending]
+            for key, model in self.members.items():
+                if key == self.fast_key:
+                    continue
+                _, proba = predict(model, subset)
+                votes = votes + proba * self.weights[key]
+            probabilities[pending] = votes / sum(self.weights.values())
+
+        with self._lock:
+            self.scored += n
+            self.short_circuited += n - pending.size
+        return self.classes_[probabilities.argmax(axis=1)], probabilities
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "members": list(self.members),
+                "scored": self.scored,
+                "short_circuited": self.short_circuited,
+                "short_circuit_rate": self.short_circuited / self.scored if self.scored else 0.0,
+            }
+
+
+def build_ensemble(get_model, keys=ENSEMBLE_MEMBERS, **kwargs):
+    # get_model(key) may come from a ModelStore, so loaded models are shared
+    members = {}
+    for key in keys:
+        try:
+            members[key] = get_model(key)
+        except FileNotFoundError:
+            continue
+    if len(members) < MIN_MEMBERS:
+        raise ValueError(f"The ensemble needs at least {MIN_MEMBERS} of {', '.join(keys)}, "
+                         f"found {', '.join(members) or 'none'}")
+    return EnsembleScorer(members, **kwargs)
@@ -0,0 +1,200 @@
+import os
+import pickle
+import threading
+
+import metrics
+
+# -----------------------------
+# Model Artifacts
+# -----------------------------
+MODEL_DIR = "best_models"
+VECTORIZER_FILE = "tfidf.pkl"
+VECTORIZER_KEY = "tfidf"
+# Flat-array export of the pickles, written by artifacts.py
+COMPACT_MANIFEST = os.path.join("compact", "manifest.json")
+MODEL_FILES = {
+    "svc": "svc_best.pkl",
+    "nb": "nb_model.pkl",
+    "linear": "linear_model.npz",
+    "bagging": "bagging_model.pkl",
+    "adaboost": "adaboost_model.pkl",
+    # Hashing-vectorizer model kept up to date by online.py
+    "online": "online_model.pkl",
+}
+# Built from the other models instead of loaded from its own file
+ENSEMBLE_KEY = "ensemble"
+MODEL_NAMES = {
+    "svc": "SVC Classifier",
+    "nb": "Naive Bayes",
+    "linear": "Linear SVM",
+    "bagging": "Bagging",
+    "adaboost": "AdaBoost",
+    "online": "Online (hashing)",
+    ENSEMBLE_KEY: "Ensemble",
+}
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def has_compact(model_dir=MODEL_DIR):
+    return os.path.exists(os.path.join(model_dir, COMPACT_MANIFEST))
+
+
+def has_model(key, model_dir=MODEL_DIR):
+    # Cheap existence check (no unpickling), e.g. to pick a default model
+    if key == ENSEMBLE_KEY:
+        from ensemble import ENSEMBLE_MEMBERS, MIN_MEMBERS
+        return sum(has_model(member, model_dir) for member in ENSEMBLE_MEMBERS) >= MIN_MEMBERS
+    if os.path.exists(os.path.join(model_dir, MODEL_FILES[key])):
+        return True
+    if has_compact(model_dir):
+        import json
+        with open(os.path.join(model_dir, COMPACT_MANIFEST), encoding="utf-8") as f:
+            return key in json.load(f).get("models", {})
+    return False
+
+
+def load_vectorizer(model_dir=MODEL_DIR, compact=True):
+    if compact and has_compact(model_dir):
+        from artifacts import load_compact_vectorizer
+        return load_compact_vectorizer(model_dir)
+    return _load_pickle(os.path.join(model_dir, VECTORIZER_FILE))
+
+
+def load_model(key, model_dir=MODEL_DIR, compact=True):
+    if key == ENSEMBLE_KEY:
+        from ensemble import build_ensemble
+        return build_ensemble(lambda member: load_model(member, model_dir, compact))
+    if key not in MODEL_FILES:
+        raise ValueError(f"Unknown model '{key}', expected one of {sorted(MODEL_NAMES)}")
+    if compact and has_compact(model_dir):
+        from artifacts import load_compact_model
+        try:
+            return load_compact_model(key, model_dir)
+        except KeyError:
+            # Not exportable (kernel SVC), fall back to the pickle
+            pass
+    path = os.path.join(model_dir, MODEL_FILES[key])
+    if key == "online":
+        from online import OnlineClassifier
+        return OnlineClassifier.load(path)
+    if path.endswith(".npz"):
+        from linear_model import LinearScorer
+        return LinearScorer.load(path)
+    return _load_pickle(path)
+
+
+class ModelStore:
+    def __init__(self, model_dir=MODEL_DIR, version=1):
+        self.model_dir = model_dir
+        # Set by ModelRegistry so results can be tagged with the store that produced them
+        self.version = version
+        self._artifacts = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _get(self, key, loader):
+        artifact = self._artifacts.get(key)
+        if artifact is not None:
+            return artifact
+        # Per-key lock so a slow SVC load does not block Naive Bayes
+        with self._key_lock(key):
+            if key not in self._artifacts:
+                self._artifacts[key] = loader()
+            return self._artifacts[key]
+
+    def vectorizer(self):
+        return self._get(VECTORIZER_KEY, lambda: load_vectorizer(self.model_dir))
+
+    def model(self, key):
+        if key == ENSEMBLE_KEY:
+            from ensemble import build_ensemble
+            # Members come from this store, so nothing is unpickled twice
+            return self._get(key, lambda: build_ensemble(self.model))
+        return self._get(key, lambda: load_model(key, self.model_dir))
+
+    def is_loaded(self, key):
+        return key in self._artifacts
+
+    def loaded_keys(self):
+        return [key for key in self._artifacts if key != VECTORIZER_KEY]
+
+    def prefetch(self, *keys):
+        def run():
+            for key in keys:
+                try:
+                    if key == VECTORIZER_KEY:
+                        self.vectorizer()
+                    else:
+                        self.model(key)
+                except Exception:
+                    # Surfaced again when the artifact is actually used
+                    pass
+
+        thread = threading.Thread(target=run, name="model-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+
+# -----------------------------
+# Sparse Inference
+# -----------------------------
+# Rows densified at a time for models that cannot take CSR input
+DENSE_CHUNK_ROWS = 256
+
+
+def accepts_sparse(model):
+    # libsvm estimators (SVC) fitted on dense arrays reject CSR input
+    return getattr(model, "_sparse", True) is not False
+
+
+def _blocks(model, vectors, chunk_rows):
+    if accepts_sparse(model):
+        yield vectors
+        return
+    for start in range(0, vectors.shape[0], chunk_rows):
+        yield vectors[start:start + chunk_rows].toarray()
+
+
+def predict(model, vectors, chunk_rows=DENSE_CHUNK_ROWS):
+    import numpy as np
+
+    labels, probabilities = [], []
+    for block in _blocks(model, vectors, chunk_rows):
+        if hasattr(model, "predict_with_proba"):
+            # Label and probability from a single scoring pass
+            block_labels, block_probabilities = model.predict_with_proba(block)
+        else:
+            block_labels, block_probabilities = model.predict(block), model.predict_proba(block)
+        labels.append(block_labels)
+        probabilities.append(block_probabilities)
+    if not labels:
+        return np.empty(0, dtype=int), np.empty((0, 2))
+    return np.concatenate(labels), np.vstack(probabilities)
+
+
+def feature_vectorizer(model, vectorizer):
+    # The online model hashes its own features instead of using the TF-IDF vocabulary
+    return model.vectorizer if getattr(model, "own_features", False) else vectorizer
+
+
+def classify_texts(vectorizer, model, transformed_texts, model_key=None):
+    vectorizer = feature_vectorizer(model, vectorizer)
+    registry = metrics.active()
+    if registry is None:
+        return predict(model, vectorizer.transform(transformed_texts))
+
+    model_key = model_key or type(model).__name__
+    with registry.timed("vectorize"):
+        vectors = vectorizer.transform(transformed_texts)
+    with registry.timed("predict", model=model_key):
+        result = predict(model, vectors)
+    registry.record_classification(model_key, transformed_texts)
+    return result
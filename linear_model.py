@@ -0,0 +1,87 @@
+import numpy as np
+
+# -----------------------------
+# Linear Scorer
+# -----------------------------
+class LinearScorer:
+    # Stored as flat arrays in an .npz: one sparse dot product per message,
+    # with Platt-style calibration turning the margin into a spam probability
+    classes_ = np.array([0, 1])
+
+    def __init__(self, coef, intercept, slope=1.0, offset=0.0, C=None):
+        self.coef = np.asarray(coef, dtype=np.float32).ravel()
+        self.intercept = float(intercept)
+        self.slope = float(slope)
+        self.offset = float(offset)
+        # Regularization the weights were fitted with, so compress.py can refit alike
+        self.C = None if C is None else float(C)
+
+    @property
+    def n_features_in_(self):
+        return self.coef.shape[0]
+
+    def decision_function(self, X):
+        if X.shape[1] != self.coef.shape[0]:
+            raise ValueError(f"X has {X.shape[1]} features, but the scorer expects {self.coef.shape[0]}")
+        return np.asarray(X @ self.coef).ravel() + self.intercept
+
+    def predict_with_proba(self, X):
+        spam = 1.0 / (1.0 + np.exp(-(self.slope * self.decision_function(X) + self.offset)))
+        return (spam >= 0.5).astype(int), np.column_stack([1.0 - spam, spam])
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+    def save(self, path):
+        extra = {} if self.C is None else {"C": np.float64(self.C)}
+        with open(path, "wb") as f:
+            np.savez(f, coef=self.coef, intercept=np.float64(self.intercept),
+                     calibration=np.array([self.slope, self.offset]), **extra)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            slope, offset = data["calibration"]
+            # Files written before C was stored load without it
+            C = data["C"] if "C" in data.files else None
+            return cls(data["coef"], data["intercept"], slope, offset, C)
+
+    @classmethod
+    def from_estimator(cls, estimator, X_cal=None, y_cal=None):
+        coef = np.asarray(estimator.coef_).ravel()
+        intercept = np.asarray(estimator.intercept_).ravel()[0]
+        scorer = cls(coef, intercept, C=getattr(estimator, "C", None))
+        # Logistic models are already calibrated (p = sigmoid(margin)),
+        # margin-only models such as LinearSVC need Platt scaling on held-out data
+        if not hasattr(estimator, "predict_proba") and X_cal is not None:
+            scorer.calibrate(scorer.decision_function(X_cal), y_cal)
+        return scorer
+
+    def calibrate(self, margins, y):
+        from sklearn.linear_model import LogisticRegression
+
+        platt = LogisticRegression(C=1e6)
+        platt.fit(np.asarray(margins).reshape(-1, 1), y)
+        self.slope = float(platt.coef_[0, 0])
+        self.offset = float(platt.intercept_[0])
+        return self
+
+
+def fit_linear(estimator, X, y, cv=5):
+    from sklearn.model_selection import cross_val_predict
+
+    if hasattr(estimator, "predict_proba"):
+        return LinearScorer.from_estimator(estimator.fit(X, y))
+    # Out-of-fold margins keep the calibration honest
+    margins = cross_val_predict(estimator, X, y, cv=cv, method="decision_function")
+    estimator.fit(X, y)
+    return LinearScorer.from_estimator(estimator).calibrate(margins, y)
+
+
+def fit_linear_svm(X, y, C=1.0, cv=5):
+    from sklearn.svm import LinearSVC
+
+    return fit_linear(LinearSVC(C=C), X, y, cv)
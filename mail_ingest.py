@@ -0,0 +1,224 @@
+import binascii
+import html
+import os
+import quopri
+import re
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser
+from email.policy import compat32
+
+# -----------------------------
+# Streaming MIME Text Extraction
+# -----------------------------
+# Messages are fed line by line. Only text/plain and text/html parts are
+# kept (up to MAX_BODY_BYTES each); attachments and other parts are skipped
+# as they stream past, so no message is ever held in memory in full.
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+
+_header_parser = BytesHeaderParser(policy=compat32)
+_html_drop = re.compile(r"<(script|style)\b.*?</\1\s*>", re.S | re.I)
+_html_tag = re.compile(r"<[^>]+>")
+_spaces = re.compile(r"[ \t\r\f\v]+")
+
+
+def html_to_text(markup):
+    text = _html_tag.sub(" ", _html_drop.sub(" ", markup))
+    return _spaces.sub(" ", html.unescape(text)).strip()
+
+
+def decode_subject(value):
+    if not value:
+        return ""
+    try:
+        return str(make_header(decode_header(value)))
+    except (ValueError, LookupError):
+        return value
+
+
+class _TextPart:
+    def __init__(self, content_type, charset, encoding):
+        self.content_type = content_type
+        self.charset = charset or "utf-8"
+        self.encoding = encoding
+        self.lines = []
+        self.size = 0
+
+    def add(self, line, limit):
+        if self.size < limit:
+            self.lines.append(line)
+            self.size += len(line)
+
+    def text(self):
+        raw = b"".join(self.lines)
+        try:
+            if self.encoding == "base64":
+                raw = binascii.a2b_base64(raw)
+            elif self.encoding == "quoted-printable":
+                raw = quopri.decodestring(raw)
+        except (binascii.Error, ValueError):
+            pass
+        try:
+            text = raw.decode(self.charset, errors="replace")
+        except LookupError:
+            text = raw.decode("utf-8", errors="replace")
+        return html_to_text(text) if self.content_type == "text/html" else text
+
+
+class MimeTextExtractor:
+    def __init__(self, max_body_bytes=MAX_BODY_BYTES):
+        self.max_body_bytes = max_body_bytes
+        self.subject = None
+        self.boundaries = []
+        self.parts = []
+        self.skipped_parts = 0
+        self._headers = []
+        self._header_size = 0
+        self._in_headers = True
+        self._current = None
+
+    def _start_entity(self):
+        headers = _header_parser.parsebytes(b"".join(self._headers))
+        self._headers = []
+        self._header_size = 0
+        self._in_headers = False
+        if self.subject is None:
+            self.subject = decode_subject(headers.get("Subject", ""))
+
+        content_type = headers.get_content_type()
+        self._current = None
+        if content_type.startswith("multipart/"):
+            boundary = headers.get_boundary()
+            if boundary:
+                self.boundaries.append(b"--" + boundary.encode("latin-1", errors="replace"))
+            return
+        disposition = (headers.get("Content-Disposition") or "").split(";")[0].strip().lower()
+        if content_type in ("text/plain", "text/html") and disposition != "attachment":
+            encoding = (headers.get("Content-Transfer-Encoding") or "").strip().lower()
+            self._current = _TextPart(content_type, headers.get_content_charset(), encoding)
+            self.parts.append(self._current)
+        else:
+            self.skipped_parts += 1
+
+    def feed(self, line):
+        if self._in_headers:
+            if line in (b"\n", b"\r\n"):
+                self._start_entity()
+            elif self._header_size < MAX_HEADER_BYTES:
+                self._headers.append(line)
+                self._header_size += len(line)
+            return
+
+        if self.boundaries and line.startswith(b"--"):
+            marker = line.rstrip(b"\r\n")
+            for depth in range(len(self.boundaries) - 1, -1, -1):
+                boundary = self.boundaries[depth]
+                if marker == boundary:
+                    del self.boundaries[depth + 1:]
+                    self._in_headers = True
+                    self._current = None
+                    return
+                if marker == boundary + b"--":
+                    # Closing boundary; what follows is epilogue of the parent
+                    del self.boundaries[depth:]
+                    self._current = None
+                    return
+
+        if self._current is not None:
+            self._current.add(line, self.max_body_bytes)
+
+    def close(self):
+        if self._in_headers and self._headers:
+            self._start_entity()
+        plain = [p for p in self.parts if p.content_type == "text/plain"]
+        chosen = plain or self.parts
+        body = "\n".join(part.text() for part in chosen).strip()
+        return self.subject or "", body
+
+# -----------------------------
+# Mailbox Walkers
+# -----------------------------
+_from_escape = re.compile(rb"^>+From ")
+
+
+def iter_mbox(path, max_body_bytes=MAX_BODY_BYTES):
+    extractor = None
+    previous_blank = True
+    with open(path, "rb") as f:
+        for line in f:
+            if line.startswith(b"From ") and previous_blank:
+                if extractor is not None:
+                    yield extractor.close()
+                extractor = MimeTextExtractor(max_body_bytes)
+                previous_blank = False
+                continue
+            previous_blank = line in (b"\n", b"\r\n")
+            if extractor is None:
+                # Not an mbox separator yet, treat the file as a single message
+                extractor = MimeTextExtractor(max_body_bytes)
+            if _from_escape.match(line):
+                line = line[1:]
+            extractor.feed(line)
+    if extractor is not None:
+        yield extractor.close()
+
+
+def iter_maildir(path, max_body_bytes=MAX_BODY_BYTES):
+    for sub in ("new", "cur"):
+        directory = os.path.join(path, sub)
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+                extractor = MimeTextExtractor(max_body_bytes)
+                with open(entry.path, "rb") as f:
+                    for line in f:
+                        extractor.feed(line)
+                yield extractor.close()
+
+
+def count_mbox(path):
+    # Same separator rule as iter_mbox, without any MIME parsing
+    count = 0
+    previous_blank = True
+    nonempty = False
+    with open(path, "rb") as f:
+        for line in f:
+            nonempty = True
+            if line.startswith(b"From ") and previous_blank:
+                count += 1
+                previous_blank = False
+                continue
+            previous_blank = line in (b"\n", b"\r\n")
+    return count or int(nonempty)
+
+
+def count_maildir(path):
+    count = 0
+    for sub in ("new", "cur"):
+        directory = os.path.join(path, sub)
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            count += sum(1 for entry in entries if entry.is_file() and not entry.name.startswith("."))
+    return count
+
+
+def is_maildir(path):
+    return os.path.isdir(os.path.join(path, "cur")) or os.path.isdir(os.path.join(path, "new"))
+
+
+def as_message_text(subject, body):
+    return f"{subject}\n{body}".strip()
+
+
+def iter_mbox_messages(path):
+    for subject, body in iter_mbox(path):
+        yield as_message_text(subject, body), None
+
+
+def iter_maildir_messages(path):
+    for subject, body in iter_maildir(path):
+        yield as_message_text(subject, body), None
@@ -0,0 +1,146 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# -----------------------------
+# Pipeline Metrics
+# -----------------------------
+# Instrumentation is off until enable() is called; hot paths check active()
+# once per call and skip all timing when it returns None.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0)
+PREFIX = "spam_classifier"
+
+STAGE_HISTOGRAM = "stage_duration_seconds"
+MESSAGES_COUNTER = "messages_total"
+TOKENS_COUNTER = "tokens_total"
+ERRORS_COUNTER = "errors_total"
+CACHE_HITS_COUNTER = "cache_hits_total"
+
+HELP = {
+    STAGE_HISTOGRAM: "Time spent in each pipeline stage",
+    MESSAGES_COUNTER: "Messages classified",
+    TOKENS_COUNTER: "Tokens left after preprocessing",
+    ERRORS_COUNTER: "Classification errors",
+    CACHE_HITS_COUNTER: "Messages answered from the prediction cache",
+}
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def record_stage(self, stage, seconds, **labels):
+        self.observe(STAGE_HISTOGRAM, seconds, stage=stage, **labels)
+        # Per-thread breakdown of the most recent message, shown in the GUI
+        last = getattr(self._local, "last", None)
+        if last is None:
+            last = self._local.last = {}
+        last[stage] = last.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, stage, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start, **labels)
+
+    def reset_last(self):
+        self._local.last = {}
+
+    def last_timings(self):
+        return dict(getattr(self._local, "last", None) or {})
+
+    def record_classification(self, model, transformed_texts):
+        self.inc(MESSAGES_COUNTER, len(transformed_texts), model=model)
+        self.inc(TOKENS_COUNTER, sum(len(t.split()) for t in transformed_texts), model=model)
+
+    def record_error(self, model):
+        self.inc(ERRORS_COUNTER, model=model)
+
+    def render_prometheus(self):
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f"# HELP {PREFIX}_{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {PREFIX}_{name} counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f"{PREFIX}_{name}{fmt_labels(labels)} {value}")
+
+            names = sorted({name for name, _ in self.histograms})
+            for name in names:
+                lines.append(f"# HELP {PREFIX}_{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {PREFIX}_{name} histogram")
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{PREFIX}_{name}_bucket{fmt_labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{PREFIX}_{name}_bucket{fmt_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{PREFIX}_{name}_sum{fmt_labels(labels)} {histogram.sum}")
+                    lines.append(f"{PREFIX}_{name}_count{fmt_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = None
+
+
+def enable():
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def disable():
+    global _registry
+    _registry = None
+
+
+def active():
+    return _registry
@@ -0,0 +1,213 @@
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from inference import MODEL_DIR, MODEL_NAMES, ModelStore, feature_vectorizer, predict
+from prediction_cache import artifact_fingerprint
+from preprocessing import transform_texts
+
+# -----------------------------
+# Hot-reloading Model Registry
+# -----------------------------
+POLL_INTERVAL = 2.0
+WARMUP_TEXT = "Congratulations! You have won a free prize, call now to claim it. See you at lunch tomorrow?"
+
+
+class ModelRegistry:
+    def __init__(self, model_dir=MODEL_DIR, poll_interval=POLL_INTERVAL):
+        self.model_dir = model_dir
+        self.poll_interval = poll_interval
+        self.store = ModelStore(model_dir)
+        self.version = 1
+        self.swaps = 0
+        self.failed_swaps = 0
+        self.last_error = None
+        self._fingerprint = artifact_fingerprint(model_dir)
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Same interface as ModelStore, always answered by the current store
+    def vectorizer(self):
+        return self.store.vectorizer()
+
+    def model(self, key):
+        return self.store.model(key)
+
+    def pair(self, key):
+        # Vectorizer and model from one store, so a swap in between cannot
+        # pair a new vocabulary with an old model
+        store = self.store
+        return store.vectorizer(), store.model(key)
+
+    def snapshot(self, key):
+        # pair() plus the version of the store it came from, for cache keys:
+        # a request still holding the old models after a swap cannot then
+        # refill the cleared cache with results the new version would read
+        store = self.store
+        return store.version, store.vectorizer(), store.model(key)
+
+    def is_loaded(self, key):
+        return self.store.is_loaded(key)
+
+    def prefetch(self, *keys):
+        return self.store.prefetch(*keys)
+
+    def on_swap(self, callback):
+        self._listeners.append(callback)
+
+    def watch(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="model-watch", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        pending = None
+        while not self._stop.wait(self.poll_interval):
+            fingerprint = artifact_fingerprint(self.model_dir)
+            if fingerprint == self._fingerprint:
+                pending = None
+            elif fingerprint != pending:
+                # Wait one quiet interval so a promote still copying files is not loaded half-way
+                pending = fingerprint
+            else:
+                self.reload(fingerprint)
+                pending = None
+
+    def reload(self, fingerprint=None):
+        with self._reload_lock:
+            fingerprint = fingerprint or artifact_fingerprint(self.model_dir)
+            # The new store loads whatever the old one had in use, off to the side
+            store = ModelStore(self.model_dir, self.version + 1)
+            try:
+                vectorizer = store.vectorizer()
+                warmup = transform_texts([WARMUP_TEXT])
+                for key in self.store.loaded_keys():
+                    model = store.model(key)
+                    predict(model, feature_vectorizer(model, vectorizer).transform(warmup))
+            except Exception as e:
+                # Keep serving the old models and do not retry the same files every poll
+                self._fingerprint = fingerprint
+                self.failed_swaps += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Model reload failed, keeping version {self.version}: {self.last_error}", file=sys.stderr)
+                return False
+
+            self.store = store
+            self._fingerprint = fingerprint
+            self.version = store.version
+            self.swaps += 1
+            self.last_error = None
+        print(f"Models reloaded from {self.model_dir} (version {self.version})", file=sys.stderr)
+        for callback in self._listeners:
+            callback(self.version)
+        return True
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "swaps": self.swaps,
+            "failed_swaps": self.failed_swaps,
+            "last_error": self.last_error,
+            "loaded": self.store.loaded_keys(),
+        }
+
+# -----------------------------
+# Shadow Scoring
+# -----------------------------
+SHADOW_FRACTION = 0.1
+SHADOW_MAX_PENDING = 16
+SHADOW_LOG_EVERY = 500
+
+
+class ShadowScorer:
+    def __init__(self, store, model_key, fraction=SHADOW_FRACTION, max_pending=SHADOW_MAX_PENDING,
+                 log_every=SHADOW_LOG_EVERY):
+        self.store = store
+        self.model_key = model_key
+        self.fraction = fraction
+        self.max_pending = max_pending
+        self.log_every = log_every
+        self.sampled = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.primary_seconds = 0.0
+        self.shadow_seconds = 0.0
+        self._pending = 0
+        self._logged_at = 0
+        self._lock = threading.Lock()
+        # One worker thread: the candidate never competes with itself for CPU
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+    def submit(self, transformed_texts, predictions, primary_seconds):
+        # Called on the primary path, so it only samples and enqueues
+        picked = [i for i in range(len(transformed_texts)) if random.random() < self.fraction]
+        if not picked:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += len(picked)
+                return False
+            self._pending += 1
+        per_message = primary_seconds / len(transformed_texts)
+        self._executor.submit(self._score, [transformed_texts[i] for i in picked],
+                              [int(predictions[i]) for i in picked], per_message * len(picked))
+        return True
+
+    def _score(self, transformed_texts, primary_predictions, primary_seconds):
+        try:
+            vectorizer = self.store.vectorizer()
+            model = self.store.model(self.model_key)
+            start = time.perf_counter()
+            predictions, _ = predict(model, feature_vectorizer(model, vectorizer).transform(transformed_texts))
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            with self._lock:
+                self._pending -= 1
+                self.errors += 1
+            print(f"Shadow {self.model_key} failed: {type(e).__name__}: {e}", file=sys.stderr)
+            return
+
+        with self._lock:
+            self._pending -= 1
+            self.sampled += len(transformed_texts)
+            self.agreed += sum(int(p) == q for p, q in zip(predictions, primary_predictions))
+            self.primary_seconds += primary_seconds
+            self.shadow_seconds += elapsed
+            due = self.sampled - self._logged_at >= self.log_every
+            if due:
+                self._logged_at = self.sampled
+        if due:
+            stats = self.stats()
+            print(f"Shadow {MODEL_NAMES[self.model_key]} ({self.store.model_dir}): "
+                  f"{stats['agreement']:.2%} agreement over {stats['sampled']} messages, "
+                  f"latency {stats['latency_delta_ms']:+.3f} ms/msg", file=sys.stderr)
+
+    def stats(self):
+        with self._lock:
+            sampled = self.sampled
+            primary_ms = self.primary_seconds * 1000 / sampled if sampled else 0.0
+            shadow_ms = self.shadow_seconds * 1000 / sampled if sampled else 0.0
+            return {
+                "model": self.model_key,
+                "candidate_dir": self.store.model_dir,
+                "fraction": self.fraction,
+                "sampled": sampled,
+                "agreement": self.agreed / sampled if sampled else None,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "primary_ms_per_message": primary_ms,
+                "shadow_ms_per_message": shadow_ms,
+                "latency_delta_ms": shadow_ms - primary_ms,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,137 @@
+import argparse
+import os
+import pickle
+import time
+
+from batch_classify import iter_chunks, open_reader
+from inference import MODEL_DIR, predict
+from preprocessing import transform_texts
+
+# -----------------------------
+# Hashing Features + Online Learner
+# -----------------------------
+ONLINE_MODEL_FILE = "online_model.pkl"
+N_FEATURES = 2 ** 18
+BATCH_SIZE = 256
+LEARNERS = ("sgd", "nb")
+
+
+class OnlineClassifier:
+    # No stored vocabulary: tokens are hashed into a fixed-width space, so
+    # unseen tokens (new URLs, brands) get weights as soon as they are learned.
+    # Inference pairs it with its own vectorizer instead of tfid.pkl.
+    own_features = True
+
+    def __init__(self, n_features=N_FEATURES, learner="sgd"):
+        if learner not in LEARNERS:
+            raise ValueError(f"Unknown learner '{learner}', expected one of {LEARNERS}")
+        self.n_features = n_features
+        self.learner = learner
+        self.model = self._make_model()
+        self.seen = 0
+        self._vectorizer = None
+
+    def _make_model(self):
+        if self.learner == "nb":
+            from sklearn.naive_bayes import MultinomialNB
+            return MultinomialNB(alpha=0.1)
+        from sklearn.linear_model import SGDClassifier
+        return SGDClassifier(loss="log_loss", alpha=1e-5, random_state=2)
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            # Non-negative features so MultinomialNB can use them too
+            self._vectorizer = HashingVectorizer(n_features=self.n_features, alternate_sign=False, norm="l2")
+        return self._vectorizer
+
+    def transform(self, transformed_texts):
+        return self.vectorizer.transform(transformed_texts)
+
+    def partial_fit(self, transformed_texts, labels):
+        self.model.partial_fit(self.transform(transformed_texts), labels, classes=[0, 1])
+        self.seen += len(labels)
+        return self
+
+    def classify(self, transformed_texts):
+        return predict(self.model, self.transform(transformed_texts))
+
+    def predict_with_proba(self, X):
+        # X comes from self.vectorizer, see inference.feature_vectorizer
+        return predict(self.model, X)
+
+    def save(self, path):
+        # Plain state rather than the object, so a file written by "python online.py"
+        # (class in __main__) still loads in batch_classify.py or service.py
+        state = {"n_features": self.n_features, "learner": self.learner, "model": self.model, "seen": self.seen}
+        with open(path, "wb") as f:
+            pickle.dump(state, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        classifier = cls(state["n_features"], state["learner"])
+        classifier.model = state["model"]
+        classifier.seen = state["seen"]
+        return classifier
+
+
+def learn_stream(classifier, messages, batch_size=BATCH_SIZE):
+    # Test-then-train: each mini-batch is scored before it is learned,
+    # which gives a running accuracy on data the model has not seen yet
+    correct = scored = 0
+    for chunk in iter_chunks(messages, batch_size):
+        chunk = [(text, label) for text, label in chunk if label is not None]
+        if not chunk:
+            continue
+        transformed = transform_texts([text for text, _ in chunk])
+        labels = [label for _, label in chunk]
+        if classifier.seen:
+            predictions, _ = classifier.classify(transformed)
+            correct += int((predictions == labels).sum())
+            scored += len(labels)
+        classifier.partial_fit(transformed, labels)
+    return correct / scored if scored else None
+
+# -----------------------------
+# Command Line
+# -----------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fold newly labelled messages into the hashing-vectorizer model.")
+    parser.add_argument("inputs", nargs="+", help="Labelled CSV/JSONL files (Message,Category or Msg,Label)")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--learner", choices=LEARNERS, default="sgd", help="Learner for a new model")
+    parser.add_argument("--n-features", type=int, default=N_FEATURES, help="Hash width for a new model")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--reset", action="store_true", help="Start a new model instead of updating the saved one")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    path = os.path.join(args.model_dir, ONLINE_MODEL_FILE)
+    if os.path.exists(path) and not args.reset:
+        classifier = OnlineClassifier.load(path)
+        print(f"Updating {path} ({classifier.learner}, {classifier.seen} messages seen)")
+    else:
+        classifier = OnlineClassifier(args.n_features, args.learner)
+        print(f"Starting a new {args.learner} model with {args.n_features} hashed features")
+
+    for input_path in args.inputs:
+        start = time.perf_counter()
+        seen = classifier.seen
+        accuracy = learn_stream(classifier, open_reader(input_path), args.batch_size)
+        learned = classifier.seen - seen
+        summary = f"{input_path}: learned {learned} messages in {time.perf_counter() - start:.1f}s"
+        if accuracy is not None:
+            summary += f", progressive accuracy {accuracy:.4f}"
+        print(summary)
+
+    classifier.save(path)
+    print(f"Saved {path} ({classifier.seen} messages seen)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+from inference import COMPACT_MANIFEST, MODEL_DIR, MODEL_FILES, VECTORIZER_FILE, classify_texts
+
+# -----------------------------
+# Prediction Cache
+# -----------------------------
+CACHE_SIZE = 10000
+CACHE_TTL = 3600
+FINGERPRINT_INTERVAL = 1.0
+
+
+def artifact_fingerprint(model_dir=MODEL_DIR):
+    fingerprint = []
+    for name in [VECTORIZER_FILE, COMPACT_MANIFEST] + sorted(MODEL_FILES.values()):
+        try:
+            st = os.stat(os.path.join(model_dir, name))
+            fingerprint.append((name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            fingerprint.append((name, None, None))
+    return tuple(fingerprint)
+
+
+class PredictionCache:
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, model_dir=MODEL_DIR,
+                 fingerprint_interval=FINGERPRINT_INTERVAL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.model_dir = model_dir
+        self.fingerprint_interval = fingerprint_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = artifact_fingerprint(model_dir)
+        self._checked_at = time.monotonic()
+
+    @staticmethod
+    def key(transformed, model_key, version=None):
+        return hashlib.sha1(f"{model_key}\0{version}\0{transformed}".encode("utf-8")).hexdigest()
+
+    def _check_artifacts(self, now):
+        # Called with the lock held; stats the pickles at most once per interval
+        if now - self._checked_at < self.fingerprint_interval:
+            return
+        self._checked_at = now
+        fingerprint = artifact_fingerprint(self.model_dir)
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._entries.clear()
+            self.invalidations += 1
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._check_artifacts(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires = entry
+            if self.ttl is not None and expires < now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now + (self.ttl or 0))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def classify_cached(cache, vectorizer, model, model_key, transformed_texts, version=None):
+    # version identifies the artifacts vectorizer/model came from (ModelRegistry.snapshot)
+    import numpy as np
+
+    transformed_texts = list(transformed_texts)
+    results = [None] * len(transformed_texts)
+    pending = {}
+    for i, transformed in enumerate(transformed_texts):
+        key = cache.key(transformed, model_key, version)
+        value = cache.get(key)
+        if value is None:
+            # Duplicates inside the batch are vectorized once
+            pending.setdefault(key, []).append(i)
+        else:
+            results[i] = value
+
+    if pending:
+        keys = list(pending)
+        texts = [transformed_texts[pending[key][0]] for key in keys]
+        predictions, probabilities = classify_texts(vectorizer, model, texts, model_key)
+        for key, prediction, proba in zip(keys, predictions, probabilities):
+            value = (prediction, proba)
+            cache.put(key, value)
+            for i in pending[key]:
+                results[i] = value
+
+    registry = metrics.active()
+    if registry is not None:
+        registry.inc(metrics.CACHE_HITS_COUNTER, len(transformed_texts) - sum(len(v) for v in pending.values()),
+                     model=model_key)
+
+    if not results:
+        return np.empty(0, dtype=int), np.empty((0, 2))
+    return np.array([r[0] for r in results]), np.vstack([r[1] for r in results])
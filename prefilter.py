@@ -0,0 +1,180 @@
+import json
+import threading
+from collections import deque
+
+from preprocessing import get_limits
+
+# -----------------------------
+# Aho-Corasick Matcher
+# -----------------------------
+class AhoCorasick:
+    def __init__(self, patterns):
+        self.patterns = sorted({p.lower() for p in patterns if p})
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern in self.patterns:
+            self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append(pattern)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                if self.fail[nxt] == nxt:
+                    self.fail[nxt] = 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern in output[state]:
+                yield end - len(pattern) + 1, pattern
+
+
+def _on_boundary(text, start, pattern):
+    # "claim" should not fire inside "reclaimed"; patterns that start or end
+    # with punctuation (".ly/", "www.") are matched as plain substrings
+    end = start + len(pattern)
+    if pattern[0].isalnum() and start > 0 and text[start - 1].isalnum():
+        return False
+    if pattern[-1].isalnum() and end < len(text) and text[end].isalnum():
+        return False
+    return True
+
+# -----------------------------
+# Rule Pre-filter
+# -----------------------------
+SPAM, HAM = 1, 0
+PREFILTER_CONFIDENCE = 0.99
+
+DEFAULT_RULES = {
+    # Strong indicators, worth 2 points each
+    "block": [
+        "bit.ly/", "tinyurl.com/", "goo.gl/", "t.co/", "cutt.ly/", "rb.gy/", "i.airtel.in/",
+        "congratulations", "you have won", "you've won", "you have been selected", "claim your", "claim now",
+        "prize", "free entry", "cash prize", "guaranteed", "txt stop", "send stop", "reply stop", "unsubscribe",
+        "urgent!", "call now", "click here", "limited time offer", "t&c", "t&cs",
+    ],
+    # Weak indicators, worth 1 point each
+    "suspicious": [
+        "free", "claim", "win", "won", "winner", "award", "txt", "\u00a3", "150p", "per msg", "cash", "urgent",
+        "offer", "www.", "http", "mobile", "ringtone", "voucher", "bonus", "apply", "18+", "hurry", "recharge", "cashback", "discount",
+    ],
+    # Trusted phrases or domains; any hit sends the message to the model instead
+    "allow": [],
+    # Points needed (with no allow hit) to settle a message as spam
+    "spam_score": 4,
+    # Block hits also needed, so weak words alone never settle a message
+    "min_block_hits": 1,
+    # Allow hits needed (with no block hit) to settle a message as ham
+    "min_allow_hits": 1,
+}
+BLOCK_WEIGHT = 2
+
+
+def load_rules(path=None):
+    rules = dict(DEFAULT_RULES)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            rules.update(json.load(f))
+    return rules
+
+
+class Prefilter:
+    def __init__(self, rules=None):
+        rules = rules or DEFAULT_RULES
+        self.block = frozenset(p.lower() for p in rules.get("block", []))
+        self.suspicious = frozenset(p.lower() for p in rules.get("suspicious", [])) - self.block
+        self.allow = frozenset(p.lower() for p in rules.get("allow", []))
+        self.spam_score = rules.get("spam_score", DEFAULT_RULES["spam_score"])
+        self.min_block_hits = rules.get("min_block_hits", DEFAULT_RULES["min_block_hits"])
+        self.min_allow_hits = rules.get("min_allow_hits", DEFAULT_RULES["min_allow_hits"])
+        self.matcher = AhoCorasick(self.block | self.suspicious | self.allow)
+        self.settled_spam = 0
+        self.settled_ham = 0
+        self.passed = 0
+        self._lock = threading.Lock()
+
+    def match(self, text):
+        # Only the part the model would score is scanned, so huge bodies stay cheap
+        lowered = text[:get_limits()[0]].lower()
+        found = {pattern for start, pattern in self.matcher.iter_matches(lowered)
+                 if _on_boundary(lowered, start, pattern)}
+        return found & self.block, found & self.suspicious, found & self.allow
+
+    def score(self, text):
+        blocked, suspicious, _ = self.match(text)
+        return BLOCK_WEIGHT * len(blocked) + len(suspicious)
+
+    def decide(self, text):
+        blocked, suspicious, allowed = self.match(text)
+        if len(blocked) >= self.min_block_hits and not allowed \
+                and BLOCK_WEIGHT * len(blocked) + len(suspicious) >= self.spam_score:
+            return SPAM
+        if allowed and len(allowed) >= self.min_allow_hits and not blocked:
+            return HAM
+        return None
+
+    def split(self, texts):
+        decisions = [self.decide(text) for text in texts]
+        with self._lock:
+            self.settled_spam += decisions.count(SPAM)
+            self.settled_ham += decisions.count(HAM)
+            self.passed += decisions.count(None)
+        return decisions
+
+    def stats(self):
+        with self._lock:
+            total = self.settled_spam + self.settled_ham + self.passed
+            return {
+                "messages": total,
+                "settled_spam": self.settled_spam,
+                "settled_ham": self.settled_ham,
+                "passed_to_model": self.passed,
+                "prefilter_fraction": (self.settled_spam + self.settled_ham) / total if total else 0.0,
+                "model_fraction": self.passed / total if total else 0.0,
+            }
+
+
+def classify_with_prefilter(prefilter, texts, classify):
+    # classify(texts) -> (labels, probabilities) for the messages the rules left open
+    import numpy as np
+
+    decisions = prefilter.split(texts)
+    labels = np.zeros(len(texts), dtype=int)
+    probabilities = np.zeros((len(texts), 2))
+    open_rows = [i for i, decision in enumerate(decisions) if decision is None]
+    for i, decision in enumerate(decisions):
+        if decision is not None:
+            labels[i] = decision
+            probabilities[i, decision] = PREFILTER_CONFIDENCE
+            probabilities[i, 1 - decision] = 1 - PREFILTER_CONFIDENCE
+    if open_rows:
+        model_labels, model_probabilities = classify([texts[i] for i in open_rows])
+        labels[open_rows] = model_labels
+        probabilities[open_rows] = model_probabilities
+    return labels, probabilities
@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import json
+import time
+
+import metrics
+
+from inference import ENSEMBLE_KEY, MODEL_FILES, MODEL_NAMES, MODEL_DIR, ModelStore
+from model_registry import POLL_INTERVAL, SHADOW_FRACTION, ModelRegistry, ShadowScorer
+from prefilter import Prefilter, classify_with_prefilter, load_rules
+from prediction_cache import CACHE_SIZE, PredictionCache, classify_cached
+from preprocessing import DEFAULT_TOKENIZER, MAX_CHARS, MAX_TOKENS, TOKENIZERS, set_limits, set_tokenizer, transform_texts
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 10
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+def format_result(prediction, proba, model_key):
+    return {
+        "prediction": "spam" if prediction == 1 else "ham",
+        "confidence": float(proba[int(prediction)]),
+        "spam_probability": float(proba[1]),
+        "model": MODEL_NAMES[model_key],
+    }
+
+
+def score_batch(cache, vectorizer, model, model_key, texts, prefilter=None, shadow=None, version=None):
+    def classify(texts):
+        transformed = transform_texts(texts)
+        start = time.perf_counter()
+        predictions, probabilities = classify_cached(cache, vectorizer, model, model_key, transformed, version)
+        if shadow is not None:
+            shadow.submit(transformed, predictions, time.perf_counter() - start)
+        return predictions, probabilities
+
+    if prefilter is not None:
+        predictions, probabilities = classify_with_prefilter(prefilter, texts, classify)
+    else:
+        predictions, probabilities = classify(texts)
+    return [format_result(p, proba, model_key) for p, proba in zip(predictions, probabilities)]
+
+
+class MicroBatcher:
+    def __init__(self, cache, models, model_key, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+                 prefilter=None, shadow=None):
+        self.cache = cache
+        self.prefilter = prefilter
+        self.shadow = shadow
+        # Anything with snapshot(key); looked up per batch so hot-reloaded models are picked up
+        self.models = models
+        self.model_key = model_key
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.messages = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, text):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def score_many(self, texts):
+        loop = asyncio.get_running_loop()
+        version, vectorizer, model = self.models.snapshot(self.model_key)
+        try:
+            return await loop.run_in_executor(None, score_batch, self.cache, vectorizer, model,
+                                              self.model_key, texts, self.prefilter, self.shadow, version)
+        except Exception:
+            registry = metrics.active()
+            if registry is not None:
+                registry.record_error(self.model_key)
+            raise
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            batch = [(text, future) for text, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            try:
+                results = await self.score_many([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.messages += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+# -----------------------------
+# HTTP Service
+# -----------------------------
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ClassificationService:
+    def __init__(self, model_dir=MODEL_DIR, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+                 cache_size=CACHE_SIZE, prefilter=None, shadow=None, poll_interval=POLL_INTERVAL):
+        self.registry = ModelRegistry(model_dir, poll_interval)
+        self.prefilter = prefilter
+        self.shadow = shadow
+        self.cache = PredictionCache(max_size=cache_size, model_dir=model_dir)
+        # Entries cached while the old models were still serving must not outlive the swap
+        self.registry.on_swap(lambda version: self.cache.clear())
+        self.metrics = metrics.enable()
+        self.registry.vectorizer()
+        self.batchers = {}
+        for key in MODEL_FILES:
+            try:
+                self.registry.model(key)
+            except FileNotFoundError:
+                print(f"Skipping {MODEL_NAMES[key]}: {MODEL_FILES[key]} not found in {model_dir}")
+                continue
+            self.batchers[key] = MicroBatcher(self.cache, self.registry, key, max_batch_size, max_wait_ms, prefilter,
+                                              self._shadow_for(key))
+        if not self.batchers:
+            raise RuntimeError(f"No models found in {model_dir}")
+
+        # Built from the store's already loaded members, nothing is unpickled again
+        try:
+            self.registry.model(ENSEMBLE_KEY)
+            self.batchers[ENSEMBLE_KEY] = MicroBatcher(self.cache, self.registry, ENSEMBLE_KEY, max_batch_size,
+                                                       max_wait_ms, prefilter, self._shadow_for(ENSEMBLE_KEY))
+        except ValueError as e:
+            print(f"Skipping {MODEL_NAMES[ENSEMBLE_KEY]}: {e}")
+        self.default_model = "svc" if "svc" in self.batchers else next(iter(self.batchers))
+
+    def _shadow_for(self, key):
+        return self.shadow if self.shadow is not None and self.shadow.model_key == key else None
+
+    def _batcher(self, payload):
+        key = payload.get("model", self.default_model)
+        if key not in self.batchers:
+            raise HttpError(400, f"Unknown model '{key}', available: {sorted(self.batchers)}")
+        return self.batchers[key]
+
+    async def handle(self, method, path, payload):
+        if path == "/metrics":
+            return self.metrics.render_prometheus()
+        if path == "/health":
+            return {
+                "status": "ok",
+                "models": sorted(self.batchers),
+                "batches": {k: b.batches for k, b in self.batchers.items()},
+                "messages": {k: b.messages for k, b in self.batchers.items()},
+                "cache": self.cache.stats(),
+                "ensemble": self.registry.model(ENSEMBLE_KEY).stats() if ENSEMBLE_KEY in self.batchers else None,
+                "prefilter": self.prefilter.stats() if self.prefilter else None,
+                "registry": self.registry.stats(),
+                "shadow": self.shadow.stats() if self.shadow else None,
+            }
+        if method != "POST":
+            raise HttpError(405, "Use POST")
+
+        if path == "/classify":
+            text = payload.get("text")
+            if not isinstance(text, str):
+                raise HttpError(400, "Expected a JSON body with a 'text' string")
+            return await self._batcher(payload).submit(text)
+
+        if path == "/classify/bulk":
+            texts = payload.get("texts")
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise HttpError(400, "Expected a JSON body with a 'texts' list of strings")
+            return {"results": await self._batcher(payload).score_many(texts) if texts else []}
+
+        raise HttpError(404, f"No route for {path}")
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close"
+        return method.upper(), path.split("?", 1)[0], body, keep_alive
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    try:
+                        payload = json.loads(body) if body else {}
+                    except ValueError:
+                        raise HttpError(400, "Body is not valid JSON")
+                    if not isinstance(payload, dict):
+                        raise HttpError(400, "Expected a JSON object")
+                    status, response = 200, await self.handle(method, path, payload)
+                except HttpError as e:
+                    status, response = e.status, {"error": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, response = 500, {"error": str(e)}
+
+                if isinstance(response, str):
+                    content_type = "text/plain; version=0.0.4"
+                    data = response.encode("utf-8")
+                else:
+                    content_type = "application/json"
+                    data = json.dumps(response).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        for batcher in self.batchers.values():
+            batcher.start()
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Serving {sorted(self.batchers)} on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for batcher in self.batchers.values():
+                await batcher.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP spam classification service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--prefilter", nargs="?", const="", metavar="RULES",
+                        help="Settle obvious spam with keyword/URL rules first (optional JSON rules file)")
+    parser.add_argument("--tokenizer", choices=TOKENIZERS, default=DEFAULT_TOKENIZER,
+                        help="regex (no punkt data needed) or nltk (word_tokenize, as the models were first trained)")
+    parser.add_argument("--max-chars", type=int, default=MAX_CHARS,
+                        help="Characters of each message that are scored, the rest is ignored")
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS, help="Tokens of each message that are scored")
+    parser.add_argument("--watch", action="store_true",
+                        help="Hot-reload models when the files in --model-dir change (e.g. after train.py --promote)")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="Seconds between checks for --watch")
+    parser.add_argument("--shadow", metavar="DIR", help="Score a candidate model from DIR in shadow mode")
+    parser.add_argument("--shadow-model", choices=sorted(MODEL_NAMES), default="svc",
+                        help="Model key the candidate is compared against")
+    parser.add_argument("--shadow-fraction", type=float, default=SHADOW_FRACTION,
+                        help="Fraction of messages also scored by the candidate")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_tokenizer(args.tokenizer)
+    set_limits(args.max_chars, args.max_tokens)
+    prefilter = Prefilter(load_rules(args.prefilter)) if args.prefilter is not None else None
+    shadow = None
+    if args.shadow:
+        candidate = ModelStore(args.shadow)
+        # Load now so a broken candidate fails at startup, not on a sampled request
+        candidate.vectorizer()
+        candidate.model(args.shadow_model)
+        shadow = ShadowScorer(candidate, args.shadow_model, args.shadow_fraction)
+    service = ClassificationService(args.model_dir, args.max_batch_size, args.max_wait_ms, args.cache_size,
+                                    prefilter, shadow, args.poll_interval)
+    if args.watch:
+        service.registry.watch()
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import string
+
+import pytest
+
+nltk = pytest.importorskip("nltk")
+
+from datasets import DATASETS, iter_csv_messages
+from preprocessing import TextPreprocessor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# Every SAMPLE_STEP-th message of each dataset; the legacy function is slow
+SAMPLE_STEP = 10
+
+
+def _require_nltk_data():
+    for resource in ("corpora/stopwords", "tokenizers/punkt_tab"):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            pytest.skip(f"NLTK data '{resource}' is not installed")
+
+
+@pytest.fixture(scope="module")
+def legacy_transform_text():
+    _require_nltk_data()
+    from nltk.corpus import stopwords
+    from nltk.stem.porter import PorterStemmer
+
+    ps = PorterStemmer()
+
+    # The original Front_end.transform_text
+    def transform_text(text):
+        text = text.lower()
+        tokens = nltk.word_tokenize(text)
+        tokens = [t for t in tokens if t.isalnum()]
+        tokens = [t for t in tokens if t not in stopwords.words('english') and t not in string.punctuation]
+        tokens = [ps.stem(t) for t in tokens]
+        return " ".join(tokens)
+    return transform_text
+
+
+def messages(path):
+    return [text for text, _ in iter_csv_messages(os.path.join(ROOT, path))]
+
+
+@pytest.mark.parametrize("path", DATASETS)
+def test_nltk_engine_matches_legacy(path, legacy_transform_text):
+    texts = messages(path)[::SAMPLE_STEP]
+    engine = TextPreprocessor(tokenizer="nltk")
+    expected = [legacy_transform_text(text) for text in texts]
+    assert engine.transform_texts(texts) == expected
+
+
+def test_nltk_engine_matches_legacy_on_edge_cases(legacy_transform_text):
+    texts = ["", "   ", "!!!", "Don't call me... I'm BUSY!!", "£1,000 cash prize!! Txt WIN to 80086",
+             "e-mail me at a@b.com or www.example.com", "Ok lar... Joking wif u oni...", "ÜBER café naïve"]
+    engine = TextPreprocessor(tokenizer="nltk")
+    assert engine.transform_texts(texts) == [legacy_transform_text(text) for text in texts]
+
+
+# -----------------------------
+# Regex tokenizer vs nltk.word_tokenize
+# -----------------------------
+# Punkt abbreviation/number handling is only approximated, see preprocessing.py
+MAX_TOKEN_DIVERGENCE = 0.015
+
+
+@pytest.fixture(scope="module")
+def engines():
+    _require_nltk_data()
+    return TextPreprocessor(tokenizer="nltk"), TextPreprocessor(tokenizer="regex")
+
+
+@pytest.mark.parametrize("text", [
+    "don't won't can't", "gonna wanna gotta gimme lemme cannot", "e-mail www.x.com £1,000 a@b.com",
+    "“quoted” 'single' (paren) [bracket]", "end of text.", "ok. see you at 5. bye","call 0800-123-456 now!!",
+])
+def test_regex_tokens_match_nltk(engines, text):
+    nltk_engine, regex_engine = engines
+    assert regex_engine.alnum_tokens(text) == nltk_engine.alnum_tokens(text)
+
+
+@pytest.mark.parametrize("path", DATASETS)
+def test_regex_tokenizer_divergence(path, engines):
+    nltk_engine, regex_engine = engines
+    texts = [text.lower() for text in messages(path)]
+    diverging = sum(nltk_engine.alnum_tokens(t) != regex_engine.alnum_tokens(t) for t in texts)
+    assert diverging / len(texts) < MAX_TOKEN_DIVERGENCE
+
+
+@pytest.mark.parametrize("path", DATASETS)
+def test_regex_tokenizer_keeps_predictions(path, engines):
+    from inference import MODEL_DIR, load_model, load_vectorizer, predict
+
+    model_dir = os.path.join(ROOT, MODEL_DIR)
+    try:
+        vectorizer, model = load_vectorizer(model_dir), load_model("nb", model_dir)
+    except FileNotFoundError:
+        pytest.skip("best_models/ Naive Bayes artifacts are not available")
+    nltk_engine, regex_engine = engines
+    texts = messages(path)
+    expected, _ = predict(model, vectorizer.transform(nltk_engine.transform_texts(texts)))
+    actual, _ = predict(model, vectorizer.transform(regex_engine.transform_texts(texts)))
+    assert (actual == expected).all()
@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+
+from datasets import DATASETS, load_messages
+from inference import MODEL_DIR, VECTORIZER_FILE, has_compact
+from linear_model import fit_linear_svm
+from preprocessing import DEFAULT_TOKENIZER, TOKENIZERS, ParallelPreprocessor, get_tokenizer, set_tokenizer
+
+# -----------------------------
+# Model Zoo
+# -----------------------------
+CACHE_DIR = ".cache"
+PREPROCESSING_VERSION = 1
+MAX_FEATURES = 3000
+ZOO_KEYS = ["nb", "lr", "svc", "linear", "knn", "dt", "bagging", "adaboost"]
+
+
+def model_zoo():
+    from sklearn.ensemble import AdaBoostClassifier, BaggingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.svm import SVC, LinearSVC
+    from sklearn.tree import DecisionTreeClassifier
+
+    # key: (artifact file, estimator, parameter grid)
+    return {
+        "nb": ("nb_model.pkl", MultinomialNB(), {"alpha": [0.01, 0.1, 0.5, 1.0]}),
+        "lr": ("lr_model.pkl", LogisticRegression(max_iter=1000, solver="liblinear"),
+               {"C": [0.1, 1.0, 10.0], "penalty": ["l1", "l2"]}),
+        "svc": ("svc_best.pkl", SVC(probability=True, random_state=2),
+                {"kernel": ["linear", "rbf", "sigmoid"], "C": [0.5, 1.0, 10.0]}),
+        # Exported as a flat weight vector instead of a pickle, see linear_model.py
+        "linear": ("linear_model.npz", LinearSVC(), {"C": [0.1, 0.5, 1.0, 5.0]}),
+        "knn": ("knn_model.pkl", KNeighborsClassifier(), {"n_neighbors": [3, 5, 9], "weights": ["uniform", "distance"]}),
+        "dt": ("dt_model.pkl", DecisionTreeClassifier(random_state=2), {"max_depth": [5, 10, 20, None]}),
+        "bagging": ("bagging_model.pkl", BaggingClassifier(random_state=2, n_jobs=1),
+                    {"n_estimators": [10, 50]}),
+        "adaboost": ("adaboost_model.pkl", AdaBoostClassifier(random_state=2),
+                     {"n_estimators": [50, 100], "learning_rate": [0.5, 1.0]}),
+    }
+
+# -----------------------------
+# Preprocessed Corpus Cache
+# -----------------------------
+def _corpus_key(paths):
+    digest = hashlib.sha1(f"v{PREPROCESSING_VERSION}-{get_tokenizer()}".encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def load_corpus(paths=DATASETS, cache_dir=CACHE_DIR, n_jobs=1, drop_duplicates=True):
+    cache_path = os.path.join(cache_dir, f"corpus-{_corpus_key(paths)}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            corpus = json.load(f)
+        print(f"Loaded preprocessed corpus from {cache_path}")
+    else:
+        texts, labels = load_messages(paths)
+        start = time.perf_counter()
+        with ParallelPreprocessor(workers=n_jobs) as pool:
+            transformed = pool.transform_texts(texts)
+        print(f"Preprocessed {len(texts)} messages in {time.perf_counter() - start:.1f}s")
+        corpus = {"texts": texts, "transformed": transformed, "labels": labels}
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(corpus, f)
+
+    if drop_duplicates:
+        seen = set()
+        keep = []
+        for i, text in enumerate(corpus["texts"]):
+            if text not in seen:
+                seen.add(text)
+                keep.append(i)
+        corpus = {name: [values[i] for i in keep] for name, values in corpus.items()}
+    return corpus
+
+# -----------------------------
+# Training
+# -----------------------------
+def evaluate(model, X, y):
+    from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score
+
+    predictions = model.predict(X)
+    return {
+        "accuracy": accuracy_score(y, predictions),
+        "precision": precision_score(y, predictions, zero_division=0),
+        "recall": recall_score(y, predictions, zero_division=0),
+        "f1": f1_score(y, predictions, zero_division=0),
+        "confusion_matrix": confusion_matrix(y, predictions).tolist(),
+    }
+
+
+def save_pickle(obj, path):
+    with open(path, "wb") as f:
+        pickle.dump(obj, f)
+
+
+def train(models=None, n_jobs=-1, output_dir=MODEL_DIR, cache_dir=CACHE_DIR, test_size=0.2, cv=5,
+          promote=False):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.model_selection import GridSearchCV, train_test_split
+
+    if promote and models and set(models) != set(ZOO_KEYS):
+        # Every promoted model must share the newly fitted tfidf.pkl vocabulary
+        raise ValueError("--promote requires training the full model zoo")
+
+    if n_jobs == 0:
+        n_jobs = -1
+    workers = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    corpus = load_corpus(cache_dir=cache_dir, n_jobs=workers)
+    X_train_text, X_test_text, y_train, y_test = train_test_split(
+        corpus["transformed"], corpus["labels"], test_size=test_size, random_state=2, stratify=corpus["labels"])
+
+    tfid = TfidfVectorizer(max_features=MAX_FEATURES)
+    X_train = tfid.fit_transform(X_train_text)
+    X_test = tfid.transform(X_test_text)
+
+    version = time.strftime("v%Y%m%d-%H%M%S")
+    version_dir = os.path.join(output_dir, "versions", version)
+    os.makedirs(version_dir, exist_ok=True)
+    save_pickle(tfid, os.path.join(version_dir, VECTORIZER_FILE))
+
+    zoo = model_zoo()
+    report = {"version": version, "tokenizer": get_tokenizer(), "train_size": X_train.shape[0], "test_size": X_test.shape[0], "models": {}}
+    for key in models or ZOO_KEYS:
+        filename, estimator, grid = zoo[key]
+        start = time.perf_counter()
+        search = GridSearchCV(estimator, grid, scoring="f1", cv=cv, n_jobs=n_jobs)
+        search.fit(X_train, y_train)
+        best = search.best_estimator_
+        if filename.endswith(".npz"):
+            best = fit_linear_svm(X_train, y_train, C=search.best_params_["C"], cv=cv)
+        elapsed = time.perf_counter() - start
+
+        metrics = evaluate(best, X_test, y_test)
+        metrics.update({"file": filename, "best_params": search.best_params_, "cv_f1": search.best_score_,
+                        "fit_seconds": elapsed})
+        report["models"][key] = metrics
+        if filename.endswith(".npz"):
+            best.save(os.path.join(version_dir, filename))
+        else:
+            save_pickle(best, os.path.join(version_dir, filename))
+        print(f"{key:>9}: f1 {metrics['f1']:.4f}  accuracy {metrics['accuracy']:.4f}  "
+              f"precision {metrics['precision']:.4f}  ({elapsed:.1f}s) {search.best_params_}")
+
+    with open(os.path.join(version_dir, "metrics.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved artifacts to {version_dir}")
+
+    if promote:
+        for name in os.listdir(version_dir):
+            if name.endswith((".pkl", ".npz")):
+                shutil.copy2(os.path.join(version_dir, name), os.path.join(output_dir, name))
+        print(f"Promoted {version} to {output_dir}")
+        if has_compact(output_dir):
+            # Keep the flat-array export in step with the new pickles
+            from artifacts import convert
+            convert(output_dir)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the TF-IDF vectorizer and model zoo into best_models/.")
+    parser.add_argument("-m", "--models", nargs="+", choices=ZOO_KEYS, help="Models to train (default: all)")
+    parser.add_argument("-j", "--n-jobs", type=int, default=-1, help="Parallel jobs for the search (-1 = all cores)")
+    parser.add_argument("--output-dir", default=MODEL_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--promote", action="store_true",
+                        help="Copy the new artifacts over the ones the app loads")
+    parser.add_argument("--tokenizer", choices=TOKENIZERS, default=DEFAULT_TOKENIZER,
+                        help="regex (no punkt data needed) or nltk (word_tokenize, as the models were first trained)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_tokenizer(args.tokenizer)
+    train(args.models, args.n_jobs, args.output_dir, args.cache_dir, args.test_size, args.cv, args.promote)
+
+
+if __name__ == "__main__":
+    main()